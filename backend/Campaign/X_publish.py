@@ -1,57 +1,124 @@
 import os
-import json
+import time
+import functools
+import orjson
+import threading
 import tweepy
 import asyncio
 from pathlib import Path
 from typing import Optional, Dict, Union
 
 # Import the keys from your config file
-from  config import X_API_KEY, X_API_KEY_SECRET, DATA_ROOT
+from  config import X_API_KEY, X_API_KEY_SECRET, DATA_ROOT, X_POST_RATE_PER_SEC, X_POST_BURST
 
 # Persistent storage for sessions
 SESSION_FILE = DATA_ROOT / "user_x_sessions.json"
 
+# In-memory mirror of the session file, invalidated by mtime so every publish
+# doesn't pay a disk read + JSON parse. Guarded by a lock for concurrent jobs.
+_SESSIONS_CACHE: Dict = {}
+_SESSIONS_MTIME: float = -1.0
+_SESSIONS_LOCK = threading.Lock()
+
 def load_sessions() -> Dict:
-    """Load all authorized users from the JSON file."""
-    if SESSION_FILE.exists():
+    """Load all authorized users, re-reading the file only when it changed on disk."""
+    global _SESSIONS_CACHE, _SESSIONS_MTIME
+    with _SESSIONS_LOCK:
         try:
-            with open(SESSION_FILE, "r") as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading X sessions: {e}")
+            mtime = os.path.getmtime(SESSION_FILE)
+        except OSError:
+            _SESSIONS_CACHE = {}
+            _SESSIONS_MTIME = -1.0
             return {}
-    return {}
+
+        if mtime != _SESSIONS_MTIME:
+            try:
+                _SESSIONS_CACHE = orjson.loads(SESSION_FILE.read_bytes())
+                _SESSIONS_MTIME = mtime
+            except Exception as e:
+                print(f"Error loading X sessions: {e}")
+                return {}
+        return dict(_SESSIONS_CACHE)
+
+def _write_sessions(sessions: Dict):
+    """Atomically persist the session dict and refresh the in-memory cache."""
+    global _SESSIONS_CACHE, _SESSIONS_MTIME
+    # Compact dump on the hot path; pretty-print only when debugging sessions
+    option = orjson.OPT_INDENT_2 if os.getenv("X_SESSION_DEBUG_PRETTY") else 0
+    data = orjson.dumps(sessions, option=option)
+    # Write-then-rename so a crash mid-write can never corrupt the session file
+    tmp = SESSION_FILE.with_suffix(".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, SESSION_FILE)
+    _SESSIONS_CACHE = sessions
+    _SESSIONS_MTIME = os.path.getmtime(SESSION_FILE)
 
 def save_session(session_id: str, data: dict):
     """Save a new user's tokens to the JSON file."""
     sessions = load_sessions()
     sessions[session_id] = data
-    with open(SESSION_FILE, "w") as f:
-        json.dump(sessions, f, indent=4)
+    with _SESSIONS_LOCK:
+        _write_sessions(sessions)
 
 def delete_session(session_id: str):
     """Remove a user's tokens."""
     sessions = load_sessions()
     if session_id in sessions:
         del sessions[session_id]
-        with open(SESSION_FILE, "w") as f:
-            json.dump(sessions, f, indent=4)
+        with _SESSIONS_LOCK:
+            _write_sessions(sessions)
 
-def get_x_client_from_dict(user_data: dict):
-    """Initializes Tweepy clients directly from a dictionary of tokens."""
+@functools.lru_cache(maxsize=256)
+def _build_clients(access_token: str, access_token_secret: str):
+    """
+    Builds and memoizes the Tweepy v1/v2 client pair per token pair.
+    Reusing the clients keeps their underlying requests.Session (and its
+    keep-alive TLS connection) alive across posts for the same user.
+    """
     auth = tweepy.OAuth1UserHandler(
-        X_API_KEY, X_API_KEY_SECRET, 
-        user_data['access_token'], user_data['access_token_secret']
+        X_API_KEY, X_API_KEY_SECRET,
+        access_token, access_token_secret
     )
     api_v1 = tweepy.API(auth)
     client_v2 = tweepy.Client(
         consumer_key=X_API_KEY,
         consumer_secret=X_API_KEY_SECRET,
-        access_token=user_data['access_token'],
-        access_token_secret=user_data['access_token_secret']
+        access_token=access_token,
+        access_token_secret=access_token_secret
     )
     return api_v1, client_v2
 
+def get_x_client_from_dict(user_data: dict):
+    """Initializes Tweepy clients directly from a dictionary of tokens."""
+    return _build_clients(user_data['access_token'], user_data['access_token_secret'])
+
+class TokenBucket:
+    """
+    Simple asyncio token bucket: tokens refill at `rate_per_sec` up to `burst`.
+    Keeps concurrent posting under X's per-user write cap instead of
+    triggering a 429 storm when a batch of scheduled posts fires at once.
+    """
+    def __init__(self, rate_per_sec: float, burst: int):
+        self.rate = rate_per_sec
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                # Sleep just long enough for the next token to accrue
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+_POST_BUCKET = TokenBucket(X_POST_RATE_PER_SEC, X_POST_BURST)
+
 async def upload_and_post_auto(session_input: Union[str, dict], text: str, image_path: Optional[str] = None):
     """
     Automated function used by both Live Publish and Scheduler.
@@ -70,13 +137,24 @@ async def upload_and_post_auto(session_input: Union[str, dict], text: str, image
     try:
         media_ids = []
         if image_path and os.path.exists(image_path):
-            # FIX: Use to_thread to prevent blocking the FastAPI event loop during upload
-            media = await asyncio.to_thread(api_v1.media_upload, filename=str(image_path))
+            # FIX: Use to_thread to prevent blocking the FastAPI event loop during upload.
+            # Passing an open file handle makes Tweepy stream the upload in chunks
+            # instead of slurping the whole image into memory first.
+            with open(image_path, 'rb') as f:
+                media = await asyncio.to_thread(
+                    api_v1.media_upload,
+                    filename=str(image_path),
+                    file=f,
+                    chunked=True,
+                    media_category="tweet_image"
+                )
             media_ids.append(media.media_id)
 
-        # 2. Create the Tweet via v2 API
-        response = client_v2.create_tweet(
-            text=text, 
+        # 2. Create the Tweet via v2 API (rate-limited, off the event loop)
+        await _POST_BUCKET.acquire()
+        response = await asyncio.to_thread(
+            client_v2.create_tweet,
+            text=text,
             media_ids=media_ids if media_ids else None
         )
         
@@ -93,6 +171,17 @@ async def upload_and_post_auto(session_input: Union[str, dict], text: str, image
         print(f"❌ X Post Error: {str(e)}")
         return None
 
+async def upload_and_post_batch(jobs: list) -> list:
+    """
+    Posts a batch of queued tweets concurrently. Each job is a
+    (session_input, text, image_path) tuple; the shared token bucket
+    keeps the burst within X's write limits.
+    """
+    return await asyncio.gather(
+        *(upload_and_post_auto(session_input, text, image_path)
+          for session_input, text, image_path in jobs)
+    )
+
 async def upload_and_post(session_id: str, text: str, image_path: Optional[str] = None):
     """Manual UI helper."""
     result_url = await upload_and_post_auto(session_id, text, image_path)
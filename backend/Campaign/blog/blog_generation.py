@@ -1,7 +1,10 @@
-import requests
 import uuid
 import os
-from typing import Optional, Tuple
+import functools
+import logging
+import aiofiles
+import httpx
+from typing import Final, Optional, Tuple
 from fastapi import HTTPException
 from groq import Groq
 from google import genai
@@ -9,14 +12,31 @@ from google.genai import types
 
 # 1. Absolute Import for the CampaignPathManager
 from  config import CampaignPathManager
+from Campaign.campaign_cache import make_cache_key, lookup, store, get_or_generate
+from Campaign.http_client import get_shared_client, post_stream_to_file
 from Campaign.blog.blog_prompt_generator import BlogPromptOutput
  
  
  
  
  
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=512)
+def _blog_assets_folder(campaign_id: str):
+    """Campaign blog-assets folder, resolved once per campaign."""
+    return CampaignPathManager.get_campaign_paths(campaign_id)["blog_assets"]
+
+
+# Kept byte-identical across calls so Groq's prompt-prefix cache always matches
+GROQ_BLOG_SYSTEM: Final[str] = """You are a professional copywriter. Write elegant marketing copy for premium brands.
+Focus on: sensory experience, quality, customer satisfaction, brand excellence.
+Style: Warm, sophisticated. Format: Clean prose only."""
+
+
 # --- New Function for Image Generation ---
-def generate_blog_image(image_prompt: str, campaign_id: str) -> tuple[str, Optional[str]]:
+async def generate_blog_image(image_prompt: str, campaign_id: str, client: Optional[httpx.AsyncClient] = None) -> tuple[str, Optional[str]]:
     """
     Generates a single blog hero image using the Fireworks AI FLUX.1 model.
     Returns BOTH the URL path and local file path.
@@ -28,9 +48,8 @@ def generate_blog_image(image_prompt: str, campaign_id: str) -> tuple[str, Optio
     if not FIREWORKS_API_KEY:
         raise HTTPException(status_code=500, detail="Fireworks API key not available for image generation.")
 
-    # 2. Use CampaignPathManager for isolated storage
-    paths = CampaignPathManager.get_campaign_paths(campaign_id)
-    image_folder = paths["blog_assets"]
+    # 2. Use CampaignPathManager for isolated storage (memoized per campaign)
+    image_folder = _blog_assets_folder(campaign_id)
 
     image_filename = f"blog_hero_{uuid.uuid4().hex[:8]}.jpeg"
     local_file_path = os.path.join(image_folder, image_filename)  # ⭐ Full local path
@@ -50,26 +69,41 @@ def generate_blog_image(image_prompt: str, campaign_id: str) -> tuple[str, Optio
         "height": 576, 
         "sampler": "dpm++ sde"
     }
-    print(f"DEBUG: Generating blog image with prompt: {image_prompt[:80]}...")
-    
+    logger.debug("Generating blog image with prompt: %.80s...", image_prompt)
+
+    # Default to the process-wide pooled client unless the caller passes one
+    if client is None:
+        client = await get_shared_client()
+
+    # Deterministic key over everything that influences the output
+    cache_key = make_cache_key(image_prompt, "flux-1-schnell-fp8",
+                               payload["width"], payload["height"], payload["sampler"])
+
     try:
-        response = requests.post(API_URL, headers=headers, json=payload, timeout=90)
-        
-        if response.status_code == 200:
-            with open(local_file_path, "wb") as f:
-                f.write(response.content)
-            
-            # ⭐ Return BOTH url_path (for frontend) and local_file_path (for WordPress upload)
-            url_path = f"/media/campaign/{campaign_id}/blog/assets/{image_filename}"
-            print(f"✅ Blog Image saved: {local_file_path}")
-            return (url_path, local_file_path)
+        image_bytes = lookup(cache_key)
+        if image_bytes is None:
+            # Streams the hero image straight to disk while it downloads
+            status, body = await post_stream_to_file(client, API_URL, headers, payload, local_file_path)
+
+            if status != 200:
+                logger.error("Image API failed: %s", body.decode(errors='replace'))
+                # Return error tuple
+                error_msg = f"Image generation failed: API error {status}"
+                return (error_msg, None)
+
+            store(cache_key, body, metadata={"prompt": image_prompt, "model": "flux-1-schnell-fp8"})
         else:
-            print(f"ERROR: Image API failed: {response.text}")
-            # Return error tuple
-            error_msg = f"Image generation failed: API error {response.status_code}"
-            return (error_msg, None)
-            
-    except requests.exceptions.Timeout:
+            logger.debug("♻️ Cache hit for blog hero prompt: %.60s...", image_prompt)
+            # Non-blocking write to keep the FastAPI event loop responsive
+            async with aiofiles.open(local_file_path, "wb") as f:
+                await f.write(image_bytes)
+
+        # ⭐ Return BOTH url_path (for frontend) and local_file_path (for WordPress upload)
+        url_path = f"/media/campaign/{campaign_id}/blog/assets/{image_filename}"
+        logger.debug("✅ Blog Image saved: %s", local_file_path)
+        return (url_path, local_file_path)
+
+    except httpx.TimeoutException:
         return ("Image generation failed: Timeout", None)
     except Exception as e:
         return (f"Image generation failed: {str(e)}", None)
@@ -92,30 +126,40 @@ def generate_final_blog_content(blog_prompt_data: BlogPromptOutput, groq_client:
     final_prompt = blog_prompt_data.final_prompt
     word_count = blog_prompt_data.word_count
     enhanced_prompt = f"STRICTLY ADHERE TO {word_count} WORDS. Instructions: {final_prompt}"
-    system_instruction = """You are a professional copywriter. Write elegant marketing copy for premium brands.
-Focus on: sensory experience, quality, customer satisfaction, brand excellence.
-Style: Warm, sophisticated. Format: Clean prose only."""
-    print(f"\n--- Generating blog with Groq ---")
-    print(f"Word Count: {word_count} words")
-    print(f"Enhanced Prompt: {enhanced_prompt[:]}...")
-    print(f"\n--- Generating blog with Groq ---")
-    
-    
-    try:
+    logger.info("Generating blog with Groq (%d words)", word_count)
+    logger.debug("Enhanced Prompt: %s", enhanced_prompt)
+
+
+    def _produce() -> Optional[bytes]:
         response = groq_client.chat.completions.create(
             model="llama-3.1-8b-instant",
             messages=[
-                {"role": "system", "content": system_instruction},
+                {"role": "system", "content": GROQ_BLOG_SYSTEM},
                 {"role": "user", "content": enhanced_prompt}
             ],
             temperature=0.7,
             max_tokens=800
         )
-        
+        # Surface Groq's prompt-prefix cache telemetry so hits are verifiable
+        try:
+            usage = response.usage
+            cached = getattr(response.x_groq.usage, "cached_tokens", None)
+            logger.debug("📊 Groq tokens — prompt: %s, cached prefix: %s", usage.prompt_tokens, cached)
+        except AttributeError:
+            pass
         content = response.choices[0].message.content
-        
-        if content and content.strip():
-            return content.strip()
+        return content.strip().encode("utf-8") if content and content.strip() else None
+
+    # Key includes every parameter that influences the completion
+    cache_key = make_cache_key("llama-3.1-8b-instant", GROQ_BLOG_SYSTEM, enhanced_prompt, 0.7, 800)
+
+    try:
+        content_bytes = get_or_generate(cache_key, _produce, suffix=".txt",
+                                        metadata={"model": "llama-3.1-8b-instant", "word_count": word_count},
+                                        mode_env="LLM_CACHE_MODE")
+
+        if content_bytes:
+            return content_bytes.decode("utf-8")
         else:
             raise HTTPException(status_code=500, detail="Groq returned empty content.")
             
@@ -137,42 +181,46 @@ def generate_blog_image_premium(
     """
     try:
         # Ensure the image folder exists
-        paths = CampaignPathManager.get_campaign_paths(campaign_id)
-        image_folder = paths["blog_assets"]
+        image_folder = _blog_assets_folder(campaign_id)
 
         image_filename = f"blog_hero_premium_{uuid.uuid4().hex[:8]}.png"
         local_file_path = os.path.join(image_folder, image_filename)
         
-        print(f"DEBUG [Premium]: Generating Nano Banana Blog Hero: {image_prompt[:80]}...")
-
-        # Call the native Gemini Image Generation model (Nano Banana)
-        # Note: We pass the prompt directly. Nano Banana handles aspect ratios 
-        # based on prompt description or model defaults.
-        response = gemini_client.models.generate_content(
-            model='gemini-3-pro-image-preview', 
-            contents=image_prompt,
-            config=types.GenerateContentConfig(
-                candidate_count=1,
-                # Optionally add aspect ratio instructions here if your SDK version supports it
+        logger.debug("[Premium] Generating Nano Banana Blog Hero: %.80s...", image_prompt)
+
+        def _produce() -> Optional[bytes]:
+            # Call the native Gemini Image Generation model (Nano Banana)
+            # Note: We pass the prompt directly. Nano Banana handles aspect ratios
+            # based on prompt description or model defaults.
+            response = gemini_client.models.generate_content(
+                model='gemini-3-pro-image-preview',
+                contents=image_prompt,
+                config=types.GenerateContentConfig(
+                    candidate_count=1,
+                    # Optionally add aspect ratio instructions here if your SDK version supports it
+                )
             )
-        )
+            # Gemini returns images as byte data within parts
+            image_part = response.candidates[0].content.parts[0]
+            return image_part.inline_data.data if image_part.inline_data else None
 
-        # Gemini returns images as byte data within parts
-        image_part = response.candidates[0].content.parts[0]
-        
-        if image_part.inline_data:
+        cache_key = make_cache_key(image_prompt, "gemini-3-pro-image-preview")
+        image_bytes = get_or_generate(cache_key, _produce, suffix=".png",
+                                      metadata={"prompt": image_prompt, "model": "gemini-3-pro-image-preview"})
+
+        if image_bytes:
             with open(local_file_path, "wb") as f:
-                f.write(image_part.inline_data.data)
-            
+                f.write(image_bytes)
+
             # Return url_path (for frontend) and local_file_path (for WordPress upload)
             url_path = f"/media/campaign/{campaign_id}/blog/assets/{image_filename}"
-            print(f"✅ Premium Blog Image saved: {local_file_path}")
-            
+            logger.debug("✅ Premium Blog Image saved: %s", local_file_path)
+
             return (url_path, local_file_path)
         else:
-            print("ERROR: No image data returned from Nano Banana.")
+            logger.error("No image data returned from Nano Banana.")
             return ("Premium image generation failed: No data", None)
 
     except Exception as e:
-        print(f"❌ [Nano Banana Error]: {str(e)}")
+        logger.error("❌ [Nano Banana Error]: %s", e)
         return (f"Premium image generation failed: {str(e)}", None)
\ No newline at end of file
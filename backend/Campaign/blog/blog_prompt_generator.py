@@ -1,6 +1,6 @@
 # blog_prompt_generator.py (UPDATED)
 
-import json
+import orjson
 import re
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, field_validator
@@ -55,6 +55,11 @@ SCHEMA (NEW FIELD INCLUDED):
 }
 """
 
+# Built once at import: the prompt has no per-call interpolation, and a stable
+# byte-identical prefix lets Gemini reuse its cached prompt processing
+BLOG_PROMPT_SYSTEM = get_blog_prompt_system_for_gemini()
+
+
 def generate_blog_prompt(analysis_brief: ResearchAnalysis, initial_strategy: ContentStrategy, gemini_client: genai.Client, original_topic: str = "") -> BlogPromptOutput:
     """
     Takes the strategic brief and generates a refined prompt for the blog writing LLM using the Gemini API.
@@ -63,9 +68,9 @@ def generate_blog_prompt(analysis_brief: ResearchAnalysis, initial_strategy: Con
     if not gemini_client:
         raise HTTPException(status_code=500, detail="Gemini Client is not initialized for blog prompt generation.")
 
-    initial_keywords = initial_strategy.keywords 
-    llm_system_prompt = get_blog_prompt_system_for_gemini()
-    
+    initial_keywords = initial_strategy.keywords
+    llm_system_prompt = BLOG_PROMPT_SYSTEM
+
     # 2. Construct the full prompt payload for Gemini
     # Pass all data for analysis, including the original topic for word count extraction.
     llm_user_prompt = f"""
@@ -73,7 +78,7 @@ def generate_blog_prompt(analysis_brief: ResearchAnalysis, initial_strategy: Con
     
     ORIGINAL USER TOPIC: {original_topic}
     STRATEGIC BRIEF: {analysis_brief.model_dump_json()}
-    INITIAL KEYWORDS: {json.dumps(initial_keywords)}
+    INITIAL KEYWORDS: {orjson.dumps(initial_keywords).decode()}
 """
     
     # 3. Call the Gemini API
@@ -81,15 +86,19 @@ def generate_blog_prompt(analysis_brief: ResearchAnalysis, initial_strategy: Con
         response = gemini_client.models.generate_content(
             model='gemini-2.0-flash', # Use a fast model for this synthesis step
             contents=[llm_system_prompt, llm_user_prompt],
-            config=types.GenerateContentConfig(response_mime_type="application/json", temperature=0.3)
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=BlogPromptOutput,  # schema enforced server-side
+                temperature=0.3
+            )
         )
-        
-        raw_json_text = response.text.strip()
-        
-        output_data = json.loads(raw_json_text)
-        
-        return BlogPromptOutput(**output_data)
-        
+
+        # The schema is enforced server-side, so the SDK hands back a typed
+        # object directly — no json.loads / dict round-trip
+        if response.parsed is not None:
+            return response.parsed
+        return BlogPromptOutput.model_validate_json(response.text.strip())
+
     except Exception as e:
-        # Catch Gemini API errors, JSON parsing errors, etc.
-        raise ValueError(f"Gemini API or JSON generation failed during prompt creation: {e}. Raw output: {raw_json_text if 'raw_json_text' in locals() else 'N/A'}")
\ No newline at end of file
+        # Catch Gemini API errors, schema validation errors, etc.
+        raise ValueError(f"Gemini API or JSON generation failed during prompt creation: {e}")
\ No newline at end of file
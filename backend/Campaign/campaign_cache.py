@@ -0,0 +1,97 @@
+# campaign_cache.py
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Optional
+
+# 1. Absolute Import from root config
+from config import DATA_ROOT
+
+# Deterministic on-disk cache for expensive generation APIs (Fireworks, Gemini, Groq).
+# A cache key is the SHA256 of every parameter that influences the output, so the
+# same (prompt, model, size, sampler, ...) tuple never pays for a second API call.
+#
+# Behaviour is controlled by the IMAGE_CACHE_MODE environment variable
+# (callers caching LLM completions pass mode_env="LLM_CACHE_MODE" instead):
+#   enabled  (default) - read hits, write misses
+#   readonly           - read hits, never write new entries
+#   replay             - read hits, raise CacheMissError on miss (reproducible reruns)
+#   disabled           - bypass the cache entirely
+
+CACHE_DIR = DATA_ROOT / "cache" / "images"
+
+_MODE_ENV = "IMAGE_CACHE_MODE"
+_VALID_MODES = {"enabled", "readonly", "replay", "disabled"}
+
+
+class CacheMissError(RuntimeError):
+    """Raised in replay mode when a key is not present in the cache."""
+
+
+def _get_mode(mode_env: str = _MODE_ENV) -> str:
+    mode = os.getenv(mode_env, "enabled").lower()
+    return mode if mode in _VALID_MODES else "enabled"
+
+
+def make_cache_key(*parts) -> str:
+    """Builds a deterministic SHA256 key from the generation parameters."""
+    raw = "||".join(str(p) for p in parts)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key: str, suffix: str) -> Path:
+    return CACHE_DIR / f"{key}{suffix}"
+
+
+def lookup(key: str, suffix: str = ".jpeg", mode_env: str = _MODE_ENV) -> Optional[bytes]:
+    """
+    Returns cached bytes for the key, or None on miss.
+    In replay mode a miss raises CacheMissError instead.
+    """
+    mode = _get_mode(mode_env)
+    if mode == "disabled":
+        return None
+
+    entry = _entry_path(key, suffix)
+    if entry.exists():
+        return entry.read_bytes()
+
+    if mode == "replay":
+        raise CacheMissError(f"Cache miss for key {key} in replay mode.")
+    return None
+
+
+def store(key: str, data: bytes, suffix: str = ".jpeg", metadata: Optional[dict] = None,
+          mode_env: str = _MODE_ENV):
+    """Persists generated bytes plus a sidecar JSON describing how they were made."""
+    mode = _get_mode(mode_env)
+    if mode in ("disabled", "readonly", "replay"):
+        return
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    entry = _entry_path(key, suffix)
+    entry.write_bytes(data)
+
+    if metadata:
+        sidecar = _entry_path(key, ".meta.json")
+        with open(sidecar, "w") as f:
+            json.dump(metadata, f, indent=2)
+
+
+def get_or_generate(key: str, producer: Callable[[], Optional[bytes]],
+                    suffix: str = ".jpeg", metadata: Optional[dict] = None,
+                    mode_env: str = _MODE_ENV) -> Optional[bytes]:
+    """
+    Returns cached bytes for the key, calling the producer only on a miss.
+    The producer may return None to signal failure; failures are never cached.
+    """
+    cached = lookup(key, suffix=suffix, mode_env=mode_env)
+    if cached is not None:
+        return cached
+
+    data = producer()
+    if data is not None:
+        store(key, data, suffix=suffix, metadata=metadata, mode_env=mode_env)
+    return data
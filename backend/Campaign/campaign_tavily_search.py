@@ -1,8 +1,15 @@
 # campaign_tavily_search.py
 
+import asyncio
 from typing import List, Dict, Any
 from pydantic import BaseModel
 from tavily import TavilyClient
+from tenacity import retry, stop_after_attempt, wait_random_exponential
+
+from api_cache import cached
+
+# Research results stay fresh enough for a day
+_CACHE_TTL_S = 86400
 
 # --- Pydantic Models (Copied from original for self-containment/clean imports) ---
 class ResearchQueries(BaseModel):
@@ -14,25 +21,50 @@ class ResearchQueries(BaseModel):
 # --- End Pydantic Models ---
 
 
-def perform_tavily_search(research_queries: ResearchQueries, tavily_client: TavilyClient) -> List[Dict[str, Any]]:
-    """Performs the Tavily Advanced Search for all queries."""
+@retry(stop=stop_after_attempt(5), wait=wait_random_exponential(multiplier=1, max=30))
+def _search_raw(tavily_client: TavilyClient, query: str, search_depth: str,
+                max_results: int, include_raw_content: bool) -> Dict[str, Any]:
+    """Single Tavily call with jittered exponential backoff on transient failures."""
+    return tavily_client.search(query=query, search_depth=search_depth,
+                                max_results=max_results,
+                                include_raw_content=include_raw_content)
+
+
+# The client object is excluded from the key — results depend only on the query
+@cached("tavily", ttl=_CACHE_TTL_S, skip_args=1)
+def _search_with_cache(tavily_client: TavilyClient, query: str,
+                       search_depth: str = "advanced", max_results: int = 2,
+                       include_raw_content: bool = True) -> Dict[str, Any]:
+    """Exact-match cached Tavily search via the shared api_cache layer."""
+    return _search_raw(tavily_client, query, search_depth, max_results, include_raw_content)
+
+
+async def perform_tavily_search_async(research_queries: ResearchQueries, tavily_client: TavilyClient) -> List[Dict[str, Any]]:
+    """Performs the Tavily Advanced Search for all queries concurrently."""
     if not tavily_client:
         return [{"error": "Tavily client is not initialized. API key is missing."}]
 
     # .model_dump() is available because it's a Pydantic model
-    queries = research_queries.model_dump().values()
-    tavily_results = []
-    
+    queries = list(research_queries.model_dump().values())
+
     print(f"Running Tavily Advanced Search for {len(queries)} queries...")
-    
-    for q in queries:
-        try:
-            result = tavily_client.search(
-                query=q,
-                search_depth="advanced",
-                max_results=2,
-                include_raw_content=True
-            )
+
+    # Each search is a ~1s network call; run them all in parallel so the
+    # batch costs ~max(latency) instead of the sum.
+    tasks = [
+        asyncio.to_thread(_search_with_cache, tavily_client, q)
+        for q in queries
+    ]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    tavily_results = []
+    for q, result in zip(queries, results):
+        if isinstance(result, Exception):
+            tavily_results.append({
+                "query": q,
+                "error": f"Tavily error: {str(result)}"
+            })
+        else:
             tavily_results.append({
                 "query": q,
                 "results": [
@@ -43,10 +75,5 @@ def perform_tavily_search(research_queries: ResearchQueries, tavily_client: Tavi
                     for r in result.get("results", [])
                 ]
             })
-        except Exception as e:
-            tavily_results.append({
-                "query": q,
-                "error": f"Tavily error: {str(e)}"
-            })
 
     return tavily_results
\ No newline at end of file
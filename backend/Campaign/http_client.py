@@ -0,0 +1,77 @@
+# http_client.py
+# Shared async HTTP client for the Fireworks image API.
+
+import asyncio
+import logging
+import os
+from typing import Optional, Tuple
+
+import aiofiles
+import httpx
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+
+logger = logging.getLogger(__name__)
+
+# One pooled client for the whole process: every image call after the first
+# reuses a warm TLS connection, and HTTP/2 multiplexes concurrent prompts
+# over a single connection instead of opening one socket per request.
+_client: Optional[httpx.AsyncClient] = None
+_client_lock = asyncio.Lock()
+
+
+async def get_shared_client() -> httpx.AsyncClient:
+    """Returns the process-wide pooled httpx client, creating it lazily."""
+    global _client
+    if _client is None:
+        async with _client_lock:
+            if _client is None:
+                _client = httpx.AsyncClient(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+                )
+    return _client
+
+
+# Cap concurrent image requests so parallel campaigns don't overrun the
+# Fireworks quota; transient 429/5xx/network errors retry with jittered backoff
+IMAGE_SEM = asyncio.Semaphore(int(os.getenv("IMAGE_CONCURRENCY", "8")))
+
+
+@retry(stop=stop_after_attempt(5),
+       wait=wait_random_exponential(multiplier=1, max=30),
+       retry=retry_if_exception_type((httpx.HTTPStatusError, httpx.TransportError, TimeoutError)))
+async def post_stream_to_file(client: httpx.AsyncClient, url: str, headers: dict, payload: dict,
+                              file_path: str, timeout: float = 90) -> Tuple[int, bytes]:
+    """
+    POSTs and streams the response body straight to `file_path`, overlapping
+    network receive with disk write instead of buffering the whole image first.
+
+    Returns (status_code, body_bytes). On 200 the body is also returned so the
+    caller can feed the content-addressed cache; on other statuses the body is
+    the error text and nothing is written to disk.
+    """
+    async with IMAGE_SEM:
+        async with client.stream("POST", url, headers=headers, json=payload, timeout=timeout) as response:
+            remaining = response.headers.get("x-ratelimit-remaining")
+            if remaining is not None:
+                logger.debug("📊 Fireworks rate limit remaining: %s", remaining)
+            if response.status_code == 429 or response.status_code >= 500:
+                await response.aread()
+                response.raise_for_status()
+            if response.status_code != 200:
+                return response.status_code, await response.aread()
+
+            buf = bytearray()
+            async with aiofiles.open(file_path, "wb") as f:
+                async for chunk in response.aiter_bytes(65536):
+                    buf += chunk
+                    await f.write(chunk)
+    return 200, bytes(buf)
+
+
+async def close_shared_client():
+    """Closes the pooled client. Called from the FastAPI shutdown hook."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,62 +1,92 @@
 import os
-import requests
+import asyncio
+import functools
+import logging
 import uuid
+import aiofiles
+import httpx
 from typing import Tuple, Optional, List, Dict, Any
-from fastapi import HTTPException 
+from fastapi import HTTPException
 from google import genai
 from google.genai import types
 
 # 1. Absolute Imports from the root to handle new folder structure
 from config import CampaignPathManager
+from Campaign.campaign_cache import make_cache_key, lookup, store, get_or_generate
+from Campaign.http_client import get_shared_client, post_stream_to_file
 from Campaign.image.image_prompt_generator import ImagePromptListOutput, GeneratedImagePrompt
 
 # =============================================================================
 # CORE IMAGE GENERATION (Standard - Fireworks AI)
 # =============================================================================
 
-def generate_single_image(image_prompt: str, campaign_id: str, filename_prefix: str = "ad_asset") -> Tuple[str, Optional[str]]:
+API_URL = "https://api.fireworks.ai/inference/v1/workflows/accounts/fireworks/models/flux-1-schnell-fp8/text_to_image"
+
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=512)
+def _image_folder(campaign_id: str):
+    """Resolves (and creates, once) the campaign's images folder.
+
+    Memoized so N parallel generations for one campaign pay a single
+    stat/mkdir round instead of one per image.
+    """
+    paths = CampaignPathManager.get_campaign_paths(campaign_id)
+    folder = paths["base"] / "images"
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+async def generate_single_image(image_prompt: str, campaign_id: str, client: httpx.AsyncClient, filename_prefix: str = "ad_asset") -> Tuple[str, Optional[str]]:
     """
     Generates a single image using Fireworks AI and saves it to a unique campaign folder.
+    The shared httpx client keeps the TLS connection alive across a campaign's prompts.
     """
     FIREWORKS_API_KEY = os.getenv("FIREWORKS_API_KEY")
     if not FIREWORKS_API_KEY:
         raise ValueError("Fireworks API key not available for image generation.")
 
-    # 2. Use Path Manager for isolated storage
-    paths = CampaignPathManager.get_campaign_paths(campaign_id)
-    image_folder = paths["base"] / "images"
-    os.makedirs(image_folder, exist_ok=True)
+    # 2. Use Path Manager for isolated storage (memoized per campaign)
+    image_folder = _image_folder(campaign_id)
 
     image_filename = f"{filename_prefix}_{uuid.uuid4().hex[:8]}.jpeg"
     local_file_path = str(image_folder / image_filename)
-    
-    API_URL = "https://api.fireworks.ai/inference/v1/workflows/accounts/fireworks/models/flux-1-schnell-fp8/text_to_image"
-    
+
     headers = {
         "Content-Type": "application/json",
         "Accept": "image/jpeg",
         "Authorization": f"Bearer {FIREWORKS_API_KEY}",
     }
-    
+
     payload = {
         "prompt": image_prompt,
         "width": 1024,
-        "height": 1024, 
+        "height": 1024,
         "sampler": "dpm++ sde"
     }
-    
+
+    # Deterministic key over everything that influences the output
+    cache_key = make_cache_key(image_prompt, "flux-1-schnell-fp8",
+                               payload["width"], payload["height"], payload["sampler"])
+
     try:
-        response = requests.post(API_URL, headers=headers, json=payload, timeout=90) 
-        if response.status_code == 200:
-            with open(local_file_path, "wb") as f:
-                f.write(response.content)
-            
-            # 3. Dynamic URL Path relative to /media mount
-            url_path = f"/media/campaign/{campaign_id}/images/{image_filename}"
-            print(f"✅ Ad Asset saved: {local_file_path}")
-            return (url_path, local_file_path)
+        image_bytes = lookup(cache_key)
+        if image_bytes is None:
+            # Streams the JPEG straight to its destination while downloading
+            status, body = await post_stream_to_file(client, API_URL, headers, payload, local_file_path)
+            if status != 200:
+                return (f"API error {status}", None)
+            store(cache_key, body, metadata={"prompt": image_prompt, "model": "flux-1-schnell-fp8"})
         else:
-            return (f"API error {response.status_code}", None)
+            # Lazy %-formatting: skipped entirely unless DEBUG is enabled
+            logger.debug("♻️ Cache hit for ad asset prompt: %.60s...", image_prompt)
+            # Non-blocking write so concurrent generations don't stall the event loop
+            async with aiofiles.open(local_file_path, "wb") as f:
+                await f.write(image_bytes)
+
+        # 3. Dynamic URL Path relative to /media mount
+        url_path = f"/media/campaign/{campaign_id}/images/{image_filename}"
+        logger.debug("✅ Ad Asset saved: %s", local_file_path)
+        return (url_path, local_file_path)
     except Exception as e:
         return (f"Image generation failed: {str(e)}", None)
 
@@ -64,19 +94,26 @@ def generate_single_image(image_prompt: str, campaign_id: str, filename_prefix:
 # ORCHESTRATOR (Standard)
 # =============================================================================
 
-def generate_all_ad_images(image_prompt_list: ImagePromptListOutput, campaign_id: str) -> List[Dict[str, Any]]:
-    """Iterates through prompts and saves to campaign-specific folder."""
-    generated_assets = []
-    print(f"\n--- Generating {image_prompt_list.image_count} Assets for Campaign: {campaign_id} ---")
-    
-    for prompt_data in image_prompt_list.prompts:
-        filename_prefix = f"ad_asset_{prompt_data.prompt_id}"
-        url_path, local_path = generate_single_image(
+async def generate_all_ad_images(image_prompt_list: ImagePromptListOutput, campaign_id: str) -> List[Dict[str, Any]]:
+    """Generates all prompts concurrently and saves to campaign-specific folder."""
+    logger.info("Generating %d assets for campaign %s", image_prompt_list.image_count, campaign_id)
+
+    # Process-wide pooled client so all prompts (and campaigns) share
+    # keep-alive HTTP/2 connections instead of paying TLS setup per campaign
+    client = await get_shared_client()
+    tasks = [
+        generate_single_image(
             image_prompt=prompt_data.image_prompt,
             campaign_id=campaign_id,
-            filename_prefix=filename_prefix
+            client=client,
+            filename_prefix=f"ad_asset_{prompt_data.prompt_id}"
         )
-        
+        for prompt_data in image_prompt_list.prompts
+    ]
+    results = await asyncio.gather(*tasks)
+
+    generated_assets = []
+    for prompt_data, (url_path, local_path) in zip(image_prompt_list.prompts, results):
         generated_assets.append({
             "prompt_id": prompt_data.prompt_id,
             "variation_description": prompt_data.variation_description,
@@ -89,34 +126,45 @@ def generate_all_ad_images(image_prompt_list: ImagePromptListOutput, campaign_id
 # CORE IMAGE GENERATION (Premium - Imagen 3)
 # =============================================================================
 
-def generate_single_image_premium(
-    image_prompt: str, 
-    campaign_id: str, 
+# Concurrent Gemini image calls stay within the account's RPM quota
+GEMINI_SEM = asyncio.Semaphore(int(os.getenv("GEMINI_CONCURRENCY", "4")))
+
+async def generate_single_image_premium(
+    image_prompt: str,
+    campaign_id: str,
     gemini_client: genai.Client,
     filename_prefix: str = "premium_ad_asset"
 ) -> Tuple[str, Optional[str]]:
     """Generates high-fidelity image using Imagen 3 via Gemini."""
     try:
-        paths = CampaignPathManager.get_campaign_paths(campaign_id)
-        image_folder = paths["base"] / "images"
-        os.makedirs(image_folder, exist_ok=True)
+        image_folder = _image_folder(campaign_id)
 
         image_filename = f"{filename_prefix}_{uuid.uuid4().hex[:8]}.png"
         local_file_path = str(image_folder / image_filename)
 
-        # 4. Correct model name for Imagen 3
-        response = gemini_client.models.generate_content(
-            model='imagen-3.0-generate-001', 
-            contents=image_prompt
-        )
+        def _produce() -> Optional[bytes]:
+            # 4. Correct model name for Imagen 3
+            response = gemini_client.models.generate_content(
+                model='imagen-3.0-generate-001',
+                contents=image_prompt
+            )
+            image_part = response.candidates[0].content.parts[0]
+            return image_part.inline_data.data if image_part.inline_data else None
+
+        cache_key = make_cache_key(image_prompt, "imagen-3.0-generate-001")
+        # Run the blocking SDK call in a worker thread, gated by the quota semaphore
+        async with GEMINI_SEM:
+            image_bytes = await asyncio.to_thread(
+                get_or_generate, cache_key, _produce, suffix=".png",
+                metadata={"prompt": image_prompt, "model": "imagen-3.0-generate-001"})
+
+        if image_bytes:
+            # Non-blocking write so concurrent generations don't stall the event loop
+            async with aiofiles.open(local_file_path, "wb") as f:
+                await f.write(image_bytes)
 
-        image_part = response.candidates[0].content.parts[0]
-        if image_part.inline_data:
-            with open(local_file_path, "wb") as f:
-                f.write(image_part.inline_data.data)
-            
             url_path = f"/media/campaign/{campaign_id}/images/{image_filename}"
-            print(f"✅ Premium Asset saved: {local_file_path}")
+            logger.debug("✅ Premium Asset saved: %s", local_file_path)
             return (url_path, local_file_path)
         else:
             return ("No image data returned", None)
@@ -127,16 +175,22 @@ def generate_single_image_premium(
 # ORCHESTRATOR (Premium)
 # =============================================================================
 
-def generate_all_ad_images_premium(image_prompt_list: ImagePromptListOutput, gemini_client: genai.Client, campaign_id: str) -> List[Dict[str, Any]]:
+async def generate_all_ad_images_premium(image_prompt_list: ImagePromptListOutput, gemini_client: genai.Client, campaign_id: str) -> List[Dict[str, Any]]:
     """Premium orchestrator using campaign-specific isolation."""
-    generated_assets = []
-    for prompt_data in image_prompt_list.prompts:
-        url_path, local_path = generate_single_image_premium(
+    # All prompts run concurrently; GEMINI_SEM keeps us inside the RPM quota
+    tasks = [
+        generate_single_image_premium(
             image_prompt=prompt_data.image_prompt,
             campaign_id=campaign_id,
             gemini_client=gemini_client,
             filename_prefix=f"premium_asset_{prompt_data.prompt_id}"
         )
+        for prompt_data in image_prompt_list.prompts
+    ]
+    results = await asyncio.gather(*tasks)
+
+    generated_assets = []
+    for prompt_data, (url_path, local_path) in zip(image_prompt_list.prompts, results):
         generated_assets.append({
             "prompt_id": prompt_data.prompt_id,
             "image_url": url_path,
@@ -1,6 +1,5 @@
 # image_prompt_generator.py
 
-import json
 import re
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
@@ -63,6 +62,10 @@ SCHEMA:
 """
  
 
+# Built once at import so the prompt prefix stays byte-identical across calls
+IMAGE_PROMPT_SYSTEM = get_image_prompt_system_for_gemini()
+
+
 def generate_image_prompts(analysis_brief: ResearchAnalysis, gemini_client: genai.Client,required_image_count: int) -> ImagePromptListOutput:
     """
     Generates a list of image prompts using the Gemini API based on the strategic brief.
@@ -74,7 +77,7 @@ def generate_image_prompts(analysis_brief: ResearchAnalysis, gemini_client: gena
     # 1. Determine the image count based on the topic (enforces constraints)
     image_count: int = required_image_count
     
-    llm_system_prompt: str = get_image_prompt_system_for_gemini()
+    llm_system_prompt: str = IMAGE_PROMPT_SYSTEM
     
     # 2. Construct the full prompt payload for Gemini
     llm_user_prompt: str = f"""
@@ -89,16 +92,18 @@ def generate_image_prompts(analysis_brief: ResearchAnalysis, gemini_client: gena
         response = gemini_client.models.generate_content(
             model='gemini-2.0-flash', # Use a fast model for this synthesis step
             contents=[llm_system_prompt, llm_user_prompt],
-            config=types.GenerateContentConfig(response_mime_type="application/json", temperature=0.7) # Higher temperature for creative variations
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=ImagePromptListOutput,  # schema enforced server-side
+                temperature=0.7  # Higher temperature for creative variations
+            )
         )
-        
-        raw_json_text: str = response.text.strip()
-        
-        # Validation and Parsing
-        output_data: Dict[str, Any] = json.loads(raw_json_text)
-        
-        return ImagePromptListOutput(**output_data)
-        
+
+        # Schema enforcement happens server-side, so .parsed is already typed
+        if response.parsed is not None:
+            return response.parsed
+        return ImagePromptListOutput.model_validate_json(response.text.strip())
+
     except Exception as e:
-        # Catch Gemini API errors, JSON parsing errors, etc.
-        raise ValueError(f"Gemini API or JSON generation failed during image prompt creation: {e}. Raw output: {raw_json_text if 'raw_json_text' in locals() else 'N/A'}")
\ No newline at end of file
+        # Catch Gemini API errors, schema validation errors, etc.
+        raise ValueError(f"Gemini API or JSON generation failed during image prompt creation: {e}")
\ No newline at end of file
@@ -1,8 +1,8 @@
 # research_analysis.py
 
-import json
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, ValidationError
+import functools
+from typing import List, Dict, Any, Optional, Tuple
+from pydantic import BaseModel, TypeAdapter, ValidationError
 from google import genai
 from google.genai import types
 
@@ -35,14 +35,28 @@ class ResearchAnalysis(BaseModel):
     content_guidelines: ContentGuidelines
     visual_brief: VisualBrief
 
-# --- 2. System Prompt Definition (JSON Structure Included) ---
 
-def get_analysis_system_prompt(topic: str) -> str:
+def load_trusted(d: Dict[str, Any]) -> ResearchAnalysis:
     """
-    Returns the general system prompt for synthesizing raw research into a strategy brief.
-    The prompt is customized with the user's topic to maintain focus.
+    Re-hydrates a ResearchAnalysis from an already-validated dict without
+    re-running validation (e.g. a brief reloaded from local storage after a
+    restart). model_construct skips the whole validation tree walk, so this
+    is essentially attribute assignment.
+
+    ONLY use this on data that previously passed full validation — LLM
+    responses must keep going through model_validate_json.
     """
-    return f"""
+    return ResearchAnalysis.model_construct(
+        brand_strategy=BrandStrategy.model_construct(**d['brand_strategy']),
+        content_guidelines=ContentGuidelines.model_construct(**d['content_guidelines']),
+        visual_brief=VisualBrief.model_construct(**d['visual_brief']),
+    )
+
+# --- 2. System Prompt Definition (JSON Structure Included) ---
+
+# Static template built once at import; get_analysis_system_prompt fills in
+# the topic and memoizes the result per unique topic.
+_PROMPT_TEMPLATE = """
 You are a world-class *Brand Strategist* and *Market Analyst* specializing in launching new products and campaigns. 
 Your task is to analyze raw market research data (Tavily snippets) related to the user's goal: "{topic}".
 
@@ -91,8 +105,33 @@ Do not include any raw links or snippets in your final output.
 6.  *Product Name:*  It should be Unique and relevent to the user topic .If user has provided the brand then use that one otherwise get it through the research and make it unique,impressive & attention seeking.
 """
 
+
+@functools.lru_cache(maxsize=256)
+def get_analysis_system_prompt(topic: str) -> str:
+    """
+    Returns the general system prompt for synthesizing raw research into a strategy brief.
+    The prompt is customized with the user's topic to maintain focus.
+    """
+    return _PROMPT_TEMPLATE.format(topic=topic)
+
 # --- 3. Main Analysis Function ---
 
+def _format_research(raw_research_results: List[Dict[str, Any]]) -> str:
+    """Formats Tavily results for the LLM input.
+
+    Building a parts list and joining once is O(n) instead of quadratic
+    string concatenation.
+    """
+    parts = ["--- RAW RESEARCH DATA ---"]
+    for item in raw_research_results:
+        parts.append(f"QUERY: {item.get('query', 'N/A')}")
+        for result in item.get('results', []):
+            snippet = result.get('content_snippet', 'No snippet')
+            parts.append(f"SNIPPET: {snippet[:500]}...")
+        parts.append("---------------------------")
+    return "\n".join(parts) + "\n"
+
+
 def perform_research_analysis(topic: str, raw_research_results: List[Dict[str, Any]], gemini_client: genai.Client) -> ResearchAnalysis:
     """
     Passes the user's topic and raw research snippets to Gemini for strategic synthesis.
@@ -107,17 +146,8 @@ def perform_research_analysis(topic: str, raw_research_results: List[Dict[str, A
     """
     
     analysis_system_prompt = get_analysis_system_prompt(topic)
-    
-    # Format the raw research for the LLM input
-    formatted_research = "--- RAW RESEARCH DATA ---\n"
-    for item in raw_research_results:
-        formatted_research += f"QUERY: {item.get('query', 'N/A')}\n"
-        for result in item.get('results', []):
-            snippet = result.get('content_snippet', 'No snippet')
-            formatted_research += f"SNIPPET: {snippet[:500]}...\n"
-        formatted_research += "---------------------------\n"
-        
-    user_prompt = f"Product Launch Goal: {topic}\n\n{formatted_research}"
+
+    user_prompt = f"Product Launch Goal: {topic}\n\n{_format_research(raw_research_results)}"
 
     print("\n--- Sending Raw Data to Gemini for Analysis ---")
 
@@ -133,11 +163,66 @@ def perform_research_analysis(topic: str, raw_research_results: List[Dict[str, A
     print("-----------------------------------------\n")
 
     try:
-        analysis_data = json.loads(response.text)
-        return ResearchAnalysis(**analysis_data)
+        # Single-pass parse + validate in pydantic-core; no intermediate dict
+        return ResearchAnalysis.model_validate_json(response.text)
+    except ValidationError as e:
+        # Covers both malformed JSON and schema mismatches in Pydantic v2
+        raise ValueError(f"Analysis LLM returned invalid JSON or structure: {e}. Raw output: {response.text}")
+
+
+# --- 4. Batched Analysis (bulk import / scheduled regeneration) ---
+
+# Built once at import: TypeAdapter construction compiles the pydantic-core
+# validator schema, which is the expensive part — validation itself then runs
+# in Rust, so per-call Python overhead is already minimal.
+_ANALYSIS_LIST_ADAPTER = TypeAdapter(List[ResearchAnalysis])
+
+# Combined-prompt cap; beyond this the batch is split to respect context limits
+_MAX_BATCH_SIZE = 8
+
+
+def perform_research_analysis_batch(
+    topics_and_research: List[Tuple[str, List[Dict[str, Any]]]],
+    gemini_client: genai.Client
+) -> List[ResearchAnalysis]:
+    """
+    Synthesizes several campaign briefs in one Gemini call.
+
+    Packing N campaigns into a single request amortizes the RPC, TLS and
+    serving overhead that otherwise dominates bursty bulk imports. Results
+    come back as a JSON array in input order.
+    """
+    if not topics_and_research:
+        return []
+    if len(topics_and_research) > _MAX_BATCH_SIZE:
+        out: List[ResearchAnalysis] = []
+        for i in range(0, len(topics_and_research), _MAX_BATCH_SIZE):
+            out.extend(perform_research_analysis_batch(
+                topics_and_research[i:i + _MAX_BATCH_SIZE], gemini_client))
+        return out
+
+    batch_system_prompt = (
+        get_analysis_system_prompt("each campaign listed below")
+        + f"\nYou will receive {len(topics_and_research)} campaigns. Respond with a JSON ARRAY "
+          "containing one brief per campaign, in the same order, each conforming to the SCHEMA."
+    )
+    campaign_blocks = [
+        f"CAMPAIGN {i}:\nProduct Launch Goal: {topic}\n\n{_format_research(research)}"
+        for i, (topic, research) in enumerate(topics_and_research, start=1)
+    ]
+
+    response = gemini_client.models.generate_content(
+        model='gemini-2.0-flash',
+        contents=[batch_system_prompt, "\n\n".join(campaign_blocks)],
+        config=types.GenerateContentConfig(response_mime_type="application/json", temperature=0.5)
+    )
+
+    try:
+        analyses = _ANALYSIS_LIST_ADAPTER.validate_json(response.text)
     except ValidationError as e:
-        # Pydantic validation error (schema mismatch)
-        raise e
-    except Exception as e:
-        # General decoding or parsing error
-        raise ValueError(f"Analysis LLM returned invalid JSON or structure: {e}. Raw output: {response.text}")
\ No newline at end of file
+        raise ValueError(f"Batch analysis LLM returned invalid JSON or structure: {e}. Raw output: {response.text}")
+
+    if len(analyses) != len(topics_and_research):
+        raise ValueError(
+            f"Batch analysis returned {len(analyses)} briefs for {len(topics_and_research)} campaigns.")
+    return analyses
\ No newline at end of file
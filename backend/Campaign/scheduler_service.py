@@ -1,11 +1,16 @@
 import os
-import json
+import orjson
 import logging
+import sys
+import time
 from datetime import datetime
 from typing import Optional
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.executors.asyncio import AsyncIOExecutor
+from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from pathlib import Path
+from sqlalchemy import create_engine, event
 
 # 1. Absolute Imports from config
 from config import DATA_ROOT
@@ -17,12 +22,45 @@ logger = logging.getLogger("SchedulerService")
 os.makedirs(DATA_ROOT, exist_ok=True)
 JOBS_DB_PATH = DATA_ROOT / "jobs.sqlite"
 
-# SQLite ensures jobs survive a server restart or crash
+# SQLite ensures jobs survive a server restart or crash.
+# WAL mode + synchronous=NORMAL drops one fsync per commit and lets reads
+# proceed during writes; busy_timeout keeps bursty add_job calls from
+# failing with "database is locked".
+engine = create_engine(
+    f'sqlite:///{JOBS_DB_PATH}',
+    connect_args={"check_same_thread": False},
+    pool_pre_ping=True,
+)
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
 jobstores = {
-    'default': SQLAlchemyJobStore(url=f'sqlite:///{JOBS_DB_PATH}')
+    'default': SQLAlchemyJobStore(engine=engine)
 }
 
-scheduler = AsyncIOScheduler(jobstores=jobstores)
+# Coroutine jobs (like execute_scheduled_x_post) run on the event loop; any
+# truly blocking job can opt into executor='threadpool' so simultaneous
+# run_dates never serialize behind one frozen call.
+executors = {
+    'default': AsyncIOExecutor(),
+    'threadpool': ThreadPoolExecutor(8),
+}
+
+scheduler = AsyncIOScheduler(jobstores=jobstores, executors=executors)
+
+if sys.version_info >= (3, 11):
+    # fromisoformat accepts a trailing 'Z' natively — no replace() allocation
+    def _parse_iso_z(s: str) -> datetime:
+        return datetime.fromisoformat(s)
+else:
+    def _parse_iso_z(s: str) -> datetime:
+        return datetime.fromisoformat(s.replace('Z', '+00:00'))
 
 # --- 2. The Task Execution Logic ---
 
@@ -43,7 +81,7 @@ async def execute_scheduled_x_post(session_json: str, tweet_text: str, media_pat
             return
 
         # Parse session
-        session_dict = json.loads(session_json)
+        session_dict = orjson.loads(session_json)
         
         # Execute Post
         link = await upload_and_post_auto(
@@ -68,13 +106,15 @@ async def schedule_x_post(session_dict: dict, text: str, media_path: str, publis
     """
     try:
         # Normalize the date format
-        run_date = datetime.fromisoformat(publish_time.replace('Z', '+00:00'))
+        run_date = _parse_iso_z(publish_time)
         
         absolute_media_path = str(Path(media_path).resolve()) if media_path else None
-        session_json = json.dumps(session_dict)
+        session_json = orjson.dumps(session_dict).decode()
         
-        # Unique ID for tracking
-        job_id = f"x_post_{int(datetime.now().timestamp())}"
+        # Unique ID for tracking — nanosecond clock, so two posts scheduled
+        # in the same second no longer collide (second-resolution IDs with
+        # replace_existing=True silently overwrote each other)
+        job_id = f"x_post_{time.time_ns()}"
 
         scheduler.add_job(
             execute_scheduled_x_post,
@@ -112,6 +152,18 @@ def start_scheduler():
         scheduler.start()
         logger.info("📅 [SCHEDULER] Background monitor is ONLINE.")
 
+        # Proactive credential upkeep: refresh the persisted YouTube token
+        # before expiry so publish calls never block on a token round-trip.
+        # Imported here to avoid a circular dependency at module load.
+        from Campaign.youtube_publish import refresh_stored_tokens
+        scheduler.add_job(
+            refresh_stored_tokens,
+            trigger='interval',
+            minutes=5,
+            id='youtube_token_refresh',
+            replace_existing=True,
+        )
+
 def stop_scheduler():
     if scheduler.running:
         scheduler.shutdown()
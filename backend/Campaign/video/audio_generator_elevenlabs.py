@@ -1,6 +1,9 @@
+import functools
+import io
 import os
-import re
-import json
+import orjson
+import string
+import wave
 from typing import List, Optional
 from pathlib import Path
 from pydantic import BaseModel
@@ -13,6 +16,9 @@ from google.oauth2 import service_account
 from  config import DATA_ROOT
 load_dotenv()
 
+# Single C-level pass per word, ~10x cheaper than re.sub in the hot loop
+_PUNCT_TBL = str.maketrans('', '', string.punctuation)
+
 # --- 1. Pydantic Models (KEPT TO PRESERVE PIPELINE) ---
 
 class Timestamp(BaseModel):
@@ -26,12 +32,15 @@ class AudioTimestampOutput(BaseModel):
 
 # --- 2. Credentials Logic (From your current Google Code) ---
 
+@functools.cache
 def get_google_credentials():
+    # Memoized: from_service_account_info parses an RSA PEM (~10 ms) — no
+    # reason to repeat that on every pipeline step
     try:
         service_account_json = os.getenv('GOOGLE_SERVICE_ACCOUNT_JSON')
         if not service_account_json:
             raise ValueError("GOOGLE_SERVICE_ACCOUNT_JSON not found in .env")
-        service_account_info = json.loads(service_account_json)
+        service_account_info = orjson.loads(service_account_json)
         return service_account.Credentials.from_service_account_info(service_account_info)
     except Exception as e:
         print(f"❌ Credentials Error: {e}")
@@ -62,13 +71,9 @@ def generate_audio_and_timestamps(
     if not final_client:
         raise ValueError("Google TTS client not initialized. Check .env")
 
-    # PREPARE SSML
+    # PREPARE SSML — one generator feeding a single join, no intermediate list
     words = final_text.split()
-    ssml_parts = ["<speak>"]
-    for i, word in enumerate(words):
-        ssml_parts.append(f"{word} <mark name='{i}'/>")
-    ssml_parts.append("</speak>")
-    ssml_string = " ".join(ssml_parts)
+    ssml_string = "<speak>" + "".join(f"{word} <mark name='{i}'/> " for i, word in enumerate(words)) + "</speak>"
 
     try:
         synthesis_input = texttospeech.SynthesisInput(ssml=ssml_string)
@@ -90,7 +95,7 @@ def generate_audio_and_timestamps(
         for timepoint in response.timepoints:
             idx = int(timepoint.mark_name)
             current_time = timepoint.time_seconds
-            clean_word = re.sub(r'[^\w\s]', '', words[idx])
+            clean_word = words[idx].translate(_PUNCT_TBL)
             timestamps_list.append(Timestamp(word=clean_word, start=round(last_time, 2), end=round(current_time, 2)))
             last_time = current_time
 
@@ -114,8 +119,119 @@ def generate_audio_and_timestamps(
     except Exception as e:
         raise RuntimeError(f"Google TTS Pipeline Error: {e}")
 
-# --- 4. Initialization Helper ---
+# --- 4. Batched Synthesis ---
+
+def generate_audio_and_timestamps_batch(
+    texts: List[str],
+    google_client: texttospeech.TextToSpeechClient = None,
+    output_audio_paths: Optional[List[str]] = None,
+    voice_name: str = "en-US-Neural2-F",
+) -> List[AudioTimestampOutput]:
+    """
+    Synthesizes several narration segments in ONE Google TTS request.
+
+    All segments are concatenated into a single SSML document; sentinel
+    marks ("seg:N") delimit segment boundaries and word marks ("N:i")
+    carry per-word timings. The request uses LINEAR16 so each segment can
+    be sliced out of the response exactly on sample offsets. This
+    amortizes the per-call RPC overhead across the whole batch.
+    """
+    if not texts:
+        return []
+
+    final_client = google_client if google_client else get_default_google_client()
+    if not final_client:
+        raise ValueError("Google TTS client not initialized. Check .env")
+    if output_audio_paths is not None and len(output_audio_paths) != len(texts):
+        raise ValueError("output_audio_paths must match texts length.")
 
+    words_per_seg = [t.split() for t in texts]
+    parts = ["<speak>"]
+    for s, words in enumerate(words_per_seg):
+        parts.append("".join(f"{w} <mark name='{s}:{i}'/> " for i, w in enumerate(words)))
+        parts.append(f"<mark name='seg:{s}'/> ")
+    parts.append("</speak>")
+    ssml_string = "".join(parts)
+
+    try:
+        synthesis_input = texttospeech.SynthesisInput(ssml=ssml_string)
+        voice = texttospeech.VoiceSelectionParams(language_code="en-US", name=voice_name)
+        audio_config = texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding.LINEAR16, speaking_rate=0.85)
+
+        response = final_client.synthesize_speech(
+            request=texttospeech.SynthesizeSpeechRequest(
+                input=synthesis_input,
+                voice=voice,
+                audio_config=audio_config,
+                enable_time_pointing=[texttospeech.SynthesizeSpeechRequest.TimepointType.SSML_MARK]
+            )
+        )
+
+        # Demultiplex timepoints into per-segment word times and boundaries
+        seg_word_times: List[List[tuple]] = [[] for _ in texts]
+        seg_end_times: List[Optional[float]] = [None] * len(texts)
+        for timepoint in response.timepoints:
+            name = timepoint.mark_name
+            if name.startswith("seg:"):
+                seg_end_times[int(name[4:])] = timepoint.time_seconds
+            else:
+                s, idx = name.split(":")
+                seg_word_times[int(s)].append((int(idx), timepoint.time_seconds))
+
+        with io.BytesIO(response.audio_content) as buf, wave.open(buf, "rb") as wav:
+            n_channels = wav.getnchannels()
+            sampwidth = wav.getsampwidth()
+            framerate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+        bytes_per_frame = n_channels * sampwidth
+        total_duration = (len(frames) // bytes_per_frame) / framerate
+
+        outputs = []
+        seg_start = 0.0
+        for s, words in enumerate(words_per_seg):
+            seg_end = seg_end_times[s] if seg_end_times[s] is not None else total_duration
+
+            # Word times are re-based so each segment starts at 0.0
+            timestamps_list = []
+            last_time = seg_start
+            for idx, current_time in sorted(seg_word_times[s]):
+                clean_word = words[idx].translate(_PUNCT_TBL)
+                timestamps_list.append(Timestamp(
+                    word=clean_word,
+                    start=round(last_time - seg_start, 2),
+                    end=round(current_time - seg_start, 2)
+                ))
+                last_time = current_time
+
+            saved_path_str = None
+            if output_audio_paths:
+                out_path = Path(output_audio_paths[s])
+                out_path.parent.mkdir(parents=True, exist_ok=True)
+                start_frame = int(seg_start * framerate)
+                end_frame = int(seg_end * framerate)
+                with wave.open(str(out_path), "wb") as seg_wav:
+                    seg_wav.setnchannels(n_channels)
+                    seg_wav.setsampwidth(sampwidth)
+                    seg_wav.setframerate(framerate)
+                    seg_wav.writeframes(frames[start_frame * bytes_per_frame:end_frame * bytes_per_frame])
+                saved_path_str = str(out_path)
+                print(f"✅ Audio segment {s} saved to: {saved_path_str}")
+
+            outputs.append(AudioTimestampOutput(
+                timestamps=timestamps_list,
+                audio_file_path=saved_path_str
+            ))
+            seg_start = seg_end
+
+        return outputs
+
+    except Exception as e:
+        raise RuntimeError(f"Google TTS Batch Pipeline Error: {e}")
+
+# --- 5. Initialization Helper ---
+
+@functools.cache
 def get_tts_client():
     creds = get_google_credentials()
     if creds:
@@ -123,15 +239,13 @@ def get_tts_client():
     return None
 
 
+@functools.cache
 def get_default_google_client():
-    """Self-contained credential loader for the pipeline."""
+    """Self-contained credential loader for the pipeline (built once)."""
     try:
-        service_account_json = os.getenv('GOOGLE_SERVICE_ACCOUNT_JSON')
-        if not service_account_json:
+        creds = get_google_credentials()
+        if not creds:
             raise ValueError("GOOGLE_SERVICE_ACCOUNT_JSON missing from .env")
-        
-        service_account_info = json.loads(service_account_json)
-        creds = service_account.Credentials.from_service_account_info(service_account_info)
         return texttospeech.TextToSpeechClient(credentials=creds)
     except Exception as e:
         print(f"❌ Google TTS Auth Error: {e}")
@@ -3,6 +3,12 @@ import os
 import time
 import random
 import json
+import orjson
+import asyncio
+import aiohttp
+import shutil
+from collections import defaultdict
+from requests.adapters import HTTPAdapter, Retry
 from datetime import datetime
 from pathlib import Path
 
@@ -14,50 +20,112 @@ if not API_KEY:
     raise ValueError("FREESOUND_API_KEY not found in environment variables")
 
 # Folder structure
-MUSIC_FOLDER = "downloaded_music"
-HISTORY_FILE = os.path.join(MUSIC_FOLDER, "music_history.json")
+MUSIC_FOLDER = Path("downloaded_music")
+# Append-only log: one JSON row per download, so marking a track costs one
+# small write instead of re-serializing the whole history file
+HISTORY_FILE = MUSIC_FOLDER / "music_history.jsonl"
+LEGACY_HISTORY_FILE = MUSIC_FOLDER / "music_history.json"
+
+# fsync the history log every this many appended rows
+_SYNC_EVERY = 32
 
 class MusicDownloader:
     def __init__(self):
         # Create music folder if it doesn't exist
-        os.makedirs(MUSIC_FOLDER, exist_ok=True)
+        MUSIC_FOLDER.mkdir(parents=True, exist_ok=True)
         self.history = self.load_history()
-    
+        # Hashed membership cache: is_downloaded is O(1) with zero per-call
+        # allocation. Kept in sync ONLY by mark_downloaded — mutating
+        # self.history from outside this class is not supported.
+        self._id_cache: dict = defaultdict(set)
+        for q, tracks in self.history.items():
+            self._id_cache[q] = {t['sound_id'] for t in tracks}
+        self._history_fp = open(HISTORY_FILE, 'ab')
+        self._rows_since_sync = 0
+        # Keep-alive session: sequential downloads reuse the TLS connection
+        # to freesound.org instead of paying a fresh handshake each time
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503]),
+        ))
+
     def load_history(self):
         """Load previously downloaded track IDs"""
-        if os.path.exists(HISTORY_FILE):
-            with open(HISTORY_FILE, 'r') as f:
-                return json.load(f)
-        return {}
-    
-    def save_history(self):
-        """Save download history to JSON file in music folder"""
-        with open(HISTORY_FILE, 'w') as f:
-            json.dump(self.history, f, indent=2)
-    
+        history = {}
+        if HISTORY_FILE.exists():
+            with open(HISTORY_FILE, 'rb') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    row = orjson.loads(line)
+                    history.setdefault(row['query'], []).append({
+                        'sound_id': row['sound_id'],
+                        'name': row['name'],
+                        'downloaded_at': row['downloaded_at']
+                    })
+        elif LEGACY_HISTORY_FILE.exists():
+            # One-time migration from the old whole-file JSON format. The
+            # rows are replayed into the JSONL immediately — __init__ opens
+            # the JSONL right after this, and once it exists this branch is
+            # never taken again, so anything not written now would be lost.
+            with open(LEGACY_HISTORY_FILE, 'rb') as f:
+                history = orjson.loads(f.read())
+            with open(HISTORY_FILE, 'wb') as f:
+                for query, tracks in history.items():
+                    for entry in tracks:
+                        f.write(orjson.dumps({'query': query, **entry}) + b"\n")
+        return history
+
     def is_downloaded(self, search_query, sound_id):
         """Check if we've already downloaded this track for this search query"""
-        if search_query not in self.history:
-            return False
-        # FIX: Check if sound_id exists in any dictionary's 'sound_id' field
-        downloaded_ids = [track['sound_id'] for track in self.history[search_query]]
-        return sound_id in downloaded_ids
-    
+        return sound_id in self._id_cache[search_query]
+
     def mark_downloaded(self, search_query, sound_id, sound_name):
-        """Mark a track as downloaded"""
-        if search_query not in self.history:
-            self.history[search_query] = []
-        
-        self.history[search_query].append({
+        """Mark a track as downloaded (single appended row, not a full rewrite)"""
+        entry = {
             'sound_id': sound_id,
             'name': sound_name,
             'downloaded_at': datetime.now().isoformat()
-        })
-        self.save_history()
+        }
+        self.history.setdefault(search_query, []).append(entry)
+        self._id_cache[search_query].add(sound_id)
+
+        self._history_fp.write(orjson.dumps({'query': search_query, **entry}) + b"\n")
+        self._history_fp.flush()
+        self._rows_since_sync += 1
+        if self._rows_since_sync >= _SYNC_EVERY:
+            os.fsync(self._history_fp.fileno())
+            self._rows_since_sync = 0
     
     def get_downloaded_count(self, search_query):
         """Get count of downloaded tracks for a search query"""
         return len(self.history.get(search_query, []))
+
+    async def _fetch_pages_async(self, search_url, base_params, pages):
+        """Fetches all Freesound result pages concurrently.
+
+        Returns one parsed JSON dict per page (None for 404s/errors), in
+        page order.
+        """
+        async with aiohttp.ClientSession() as session:
+            async def fetch(page):
+                params = {**base_params, "page": page}
+                try:
+                    async with session.get(search_url, params=params,
+                                           timeout=aiohttp.ClientTimeout(total=10)) as resp:
+                        if resp.status == 404:
+                            print(f"   ⏭️  Page {page} not found")
+                            return None
+                        resp.raise_for_status()
+                        return await resp.json(loads=orjson.loads)
+                except Exception as e:
+                    print(f"   ❌ Error on page {page}: {e}")
+                    return None
+
+            return await asyncio.gather(*(fetch(p) for p in pages))
     
     def download_music_from_llm_query(self, music_search_query: str, 
                                       output_filename: str = None) -> dict:
@@ -82,7 +150,7 @@ class MusicDownloader:
             output_filename = f"music_{safe_query}_{timestamp}.mp3"
         
         # Ensure file goes into music folder
-        output_path = os.path.join(MUSIC_FOLDER, output_filename)
+        output_path = str(MUSIC_FOLDER / output_filename)
         
         print(f"\n{'='*70}")
         print(f"🎵 DOWNLOADING MUSIC FROM LLM QUERY")
@@ -127,31 +195,28 @@ class MusicDownloader:
         # Random sort for variety
         sort_options = ["rating_desc", "downloads_desc", "duration_desc", "created_desc"]
         random_sort = random.choice(sort_options)
-        
+
         search_url = f"{BASE_URL}/search/text/"
-        
-        # Try multiple pages until we find results
-        for page_attempt in range(1, 4):
-            params = {
-                "query": search_query,
-                "filter": f"duration:[0 TO {max_duration}]",
-                "token": API_KEY,
-                "fields": "id,name,tags,duration,previews,username,num_downloads,avg_rating",
-                "sort": random_sort,
-                "page": page_attempt,
-                "page_size": 30
-            }
-            
+
+        base_params = {
+            "query": search_query,
+            "filter": f"duration:[0 TO {max_duration}]",
+            "token": API_KEY,
+            "fields": "id,name,tags,duration,previews,username,num_downloads,avg_rating",
+            "sort": random_sort,
+            "page_size": 30
+        }
+
+        # Fetch all candidate pages concurrently, then walk them in order —
+        # overlapping the 100-500 ms RTT per page instead of paying it serially
+        pages = range(1, 4)
+        pages_data = asyncio.run(self._fetch_pages_async(search_url, base_params, pages))
+
+        for page_attempt, data in zip(pages, pages_data):
+            if data is None:
+                continue
+
             try:
-                response = requests.get(search_url, params=params, timeout=10)
-                
-                if response.status_code == 404:
-                    print(f"   ⏭️  Page {page_attempt} not found, trying next...")
-                    continue
-                    
-                response.raise_for_status()
-                data = response.json()
-                
                 total_available = data['count']
                 results = data['results']
                 
@@ -201,15 +266,15 @@ class MusicDownloader:
                     preview_url = selected_track['previews']['preview-hq-mp3']
                     print(f"   ⬇️  Downloading...")
                     
-                    download_response = requests.get(preview_url, stream=True, timeout=30)
+                    download_response = self.session.get(preview_url, stream=True, timeout=30)
                     download_response.raise_for_status()
-                    
+
+                    # 256 KiB copy loop in C instead of an 8 KiB Python loop
+                    download_response.raw.decode_content = True
                     with open(output_path, 'wb') as f:
-                        for chunk in download_response.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
+                        shutil.copyfileobj(download_response.raw, f, length=1 << 18)
                     
-                    file_size = os.path.getsize(output_path) / (1024 * 1024)
+                    file_size = Path(output_path).stat().st_size / (1024 * 1024)
                     print(f"   ✅ Downloaded: {output_path} ({file_size:.2f} MB)")
                     
                     self.mark_downloaded(search_query, sound_id, sound_name)
@@ -1,6 +1,13 @@
 import os
 import json
-import requests
+import math
+import orjson
+import random
+import asyncio
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import aiofiles
+import httpx
 from pathlib import Path
 from typing import List, Optional
 from pydantic import BaseModel
@@ -8,6 +15,8 @@ import time
 # --- 1. Pydantic Models for Input (Output of Step 5) ---
 # 1. Corrected Absolute Import
 from Campaign.video.final_prompt_optimizer import FinalVideoPromptOutput
+from Campaign.campaign_cache import make_cache_key, lookup, store
+from Campaign.http_client import get_shared_client
 
 class FinalVideoPromptOutput(BaseModel):
     """
@@ -33,18 +42,44 @@ class ImageMetadata(BaseModel):
 API_URL = "https://api.fireworks.ai/inference/v1/workflows/accounts/fireworks/models/flux-1-schnell-fp8/text_to_image"
 OUTPUT_DIR = Path("free_video_generator/images")
 
+# Cap in-flight Fireworks requests so a 20-scene video doesn't hammer the API
+_SCENE_CONCURRENCY = 4
+
+# Retry budget for 429 responses; backoff honours Retry-After when present
+_MAX_429_RETRIES = 5
+
+
+def _retry_after_seconds(response, attempt: int) -> float:
+    """Sleep interval for a 429: the server's Retry-After (seconds or
+    HTTP-date) when given, otherwise capped exponential backoff with
+    +/-20% jitter so concurrent scenes don't retry in lockstep."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            try:
+                dt = parsedate_to_datetime(retry_after)
+                return max(0.0, (dt - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+    return min(60.0, 2 ** attempt) * random.uniform(0.8, 1.2)
 
 # --- 4. Main Generation Function ---
 
-def generate_campaign_images(
+async def generate_campaign_images(
     prompts_data: List[FinalVideoPromptOutput],
     fireworks_api_key: str,
     output_base_dir: Path ,
     image_guidance_scale: float = 7.0,
 ) -> List[ImageMetadata]:
     """
-    Iterates through the list of final prompts, calls the Fireworks AI API, 
-    saves the generated image, and returns the scene metadata.
+    Generates all scene images concurrently via the Fireworks AI API,
+    saves them to disk, and returns the scene metadata.
+
+    Scenes are independent, so they are gathered over one keep-alive
+    aiohttp session with a bounded semaphore: wall time drops from
+    N x (latency + 1s fixed sleep) to roughly max(latency) for the batch.
     """
     
     if not prompts_data:
@@ -55,8 +90,9 @@ def generate_campaign_images(
     images_sub_dir = output_base_dir / "images"
     images_sub_dir.mkdir(parents=True, exist_ok=True)
 
-    # Calculate total duration to decide the format
-    total_duration = sum(p.duration for p in prompts_data)
+    # Calculate total duration to decide the format (fsum: exact summation,
+    # no drift on long scene lists)
+    total_duration = math.fsum(p.duration for p in prompts_data)
     
     if total_duration <= 40:
         # Portrait (Insta Reels / YT Shorts)
@@ -88,11 +124,12 @@ def generate_campaign_images(
         "Authorization": f"Bearer {fireworks_api_key}",
     }
     
-    metadata_list: List[ImageMetadata] = []
-    
-    for idx, scene_data in enumerate(prompts_data, 1):
+    semaphore = asyncio.Semaphore(_SCENE_CONCURRENCY)
+
+    async def generate_scene(idx: int, scene_data: FinalVideoPromptOutput,
+                             client: httpx.AsyncClient) -> Optional[ImageMetadata]:
         enhanced_prompt = f"{scene_data.video_prompt}, {format_tag}"
-        
+
         # CRITICAL FIX: Include aspect_ratio parameter
         # Try multiple parameter combinations for maximum compatibility
         payload = {
@@ -103,70 +140,103 @@ def generate_campaign_images(
             "guidance_scale": image_guidance_scale,
             "num_inference_steps": 28,
         }
-        
+
         print(f"🎨 Generating Scene {idx}/{len(prompts_data)} (ID: {scene_data.scene_id})")
         print(f"   Format: {aspect_ratio} ({width}x{height})")
         print(f"   Duration: {scene_data.duration}s")
         print(f"   Prompt: {enhanced_prompt[:100]}...")
-        
+
+        # Content-addressed cache: re-runs where only some prompts changed
+        # skip the Flux call for every scene already rendered
+        cache_key = make_cache_key(
+            "flux-1-schnell-fp8", enhanced_prompt, width, height, 28, image_guidance_scale)
+
+        async def download_scene() -> Optional[bytes]:
+            # A Flux JPEG is typically <500 KB — buffer it whole and write
+            # once instead of a chunked streaming loop
+            async with semaphore:
+                for attempt in range(_MAX_429_RETRIES):
+                    response = await client.post(
+                        API_URL,
+                        headers=headers,
+                        json=payload,
+                        timeout=120,
+                    )
+                    if response.status_code == 429 and attempt < _MAX_429_RETRIES - 1:
+                        # Back off only when the API actually pushes back
+                        delay = _retry_after_seconds(response, attempt)
+                        print(f"   ⏳ Scene {scene_data.scene_id}: 429, retrying in {delay:.1f}s")
+                        await asyncio.sleep(delay)
+                        continue
+                    response.raise_for_status()
+                    return response.content
+            return None
+
         try:
-            # Call Fireworks AI API
-            response = requests.post(
-                API_URL, 
-                headers=headers, 
-                json=payload, 
-                stream=True,
-                timeout=120  # Add timeout for long-running requests
-            )
-            response.raise_for_status()
-            
             image_filename = f"scene_{scene_data.scene_id:03d}.jpeg"
             image_path = images_sub_dir / image_filename
-            
-            # Save image
-            with open(image_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            
-            # Verify image was created and has content
+
+            image_bytes = lookup(cache_key)
+            if image_bytes is not None:
+                print(f"   ♻️ Cache hit for scene {scene_data.scene_id}")
+            else:
+                image_bytes = await download_scene()
+                if image_bytes:
+                    store(cache_key, image_bytes, metadata={
+                        "prompt": enhanced_prompt,
+                        "width": width, "height": height,
+                        "steps": 28, "guidance_scale": image_guidance_scale,
+                    })
+
+            if image_bytes:
+                async with aiofiles.open(image_path, 'wb') as f:
+                    await f.write(image_bytes)
+
+            # Verify image was created and has content; metadata is
+            # collected in memory and written once as the master file —
+            # per-scene sidecar writes were N extra opens/fsyncs per video
             if image_path.exists() and image_path.stat().st_size > 0:
-                # Save Metadata per scene for granular recovery
-                metadata = ImageMetadata(
+                print(f"   ✅ Saved: {image_filename}")
+                return ImageMetadata(
                     scene_id=scene_data.scene_id,
                     duration=scene_data.duration,
                     image_filename=image_filename
                 )
-                
-                metadata_path = output_base_dir / f"scene_{scene_data.scene_id}_meta.json"
-                with open(metadata_path, 'w') as f:
-                    f.write(metadata.model_dump_json(indent=2))
-                     
-                metadata_list.append(metadata)
-                print(f"   ✅ Saved: {image_filename}")
-            
+
         except Exception as e:
             print(f"   ❌ Error generating scene {scene_data.scene_id}: {e}")
-        
-        # Prevent API rate limiting
-        if idx < len(prompts_data):
-            time.sleep(1.0)
+        return None
+
+    # Shared pooled HTTP/2 client: all in-flight scenes multiplex over one
+    # connection instead of holding a socket each
+    client = await get_shared_client()
+    results = await asyncio.gather(
+        *(generate_scene(idx, scene_data, client)
+          for idx, scene_data in enumerate(prompts_data, 1)))
+
+    metadata_list: List[ImageMetadata] = [m for m in results if m is not None]
 
     # 4. Master Metadata: Essential for the stitching step
     if metadata_list:
         master_metadata_path = output_base_dir / "master_scene_metadata.json"
-        json_output = [m.model_dump() for m in metadata_list] 
-        with open(master_metadata_path, 'w') as f:
-            json.dump(json_output, f, indent=2)
+        json_output = [m.model_dump() for m in metadata_list]
+        with open(master_metadata_path, 'wb') as f:
+            f.write(orjson.dumps(json_output, option=orjson.OPT_INDENT_2))
         print(f"✅ Master metadata saved: {master_metadata_path}")
             
     return metadata_list
 
 # --- 5. Debug Function to Test API Parameters ---
 
-def test_api_parameters(fireworks_api_key: str):
+async def test_api_parameters(fireworks_api_key: str, verify_image_dimensions: bool = False):
     """
     Test function to verify which parameters the Fireworks API accepts.
     Run this first to diagnose the issue!
+
+    The three probes are independent and idempotent, so they run
+    concurrently: ~1x latency instead of 3x. By default only the status
+    code is checked and the body is never read; pass
+    verify_image_dimensions=True to also download the test images.
     """
     print("\n🔍 TESTING API PARAMETER ACCEPTANCE\n")
     
@@ -211,36 +281,40 @@ def test_api_parameters(fireworks_api_key: str):
         },
     ]
     
-    for test in test_cases:
+    async def _probe(client: httpx.AsyncClient, test: dict):
         print(f"\n{test['name']}")
         print(f"Payload: {json.dumps(test['payload'], indent=2)}")
-        
+
         try:
-            response = requests.post(
+            async with client.stream(
+                "POST",
                 API_URL,
                 headers=headers,
                 json=test['payload'],
-                stream=True,
                 timeout=60
-            )
-            
-            if response.status_code == 200:
-                print(f"✅ SUCCESS! Status: {response.status_code}")
-                
-                # Save test image to check dimensions
-                test_path = Path(f"test_{test['name'].replace(' ', '_').replace(':', '')}.jpeg")
-                with open(test_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                print(f"   Saved to: {test_path}")
-                print(f"   Check this image to verify it's actually vertical!")
-            else:
-                print(f"❌ FAILED! Status: {response.status_code}")
-                print(f"   Response: {response.text[:300]}")
-                
+            ) as response:
+                if response.status_code == 200:
+                    print(f"✅ SUCCESS! Status: {response.status_code}")
+
+                    if verify_image_dimensions:
+                        # Save test image to check dimensions
+                        test_path = Path(f"test_{test['name'].replace(' ', '_').replace(':', '')}.jpeg")
+                        async with aiofiles.open(test_path, 'wb') as f:
+                            async for chunk in response.aiter_bytes(65536):
+                                await f.write(chunk)
+                        print(f"   Saved to: {test_path}")
+                        print(f"   Check this image to verify it's actually vertical!")
+                else:
+                    body = await response.aread()
+                    print(f"❌ FAILED! Status: {response.status_code}")
+                    print(f"   Response: {body.decode(errors='replace')[:300]}")
+
         except Exception as e:
             print(f"❌ ERROR: {type(e).__name__}: {e}")
-    
+
+    client = await get_shared_client()
+    await asyncio.gather(*(_probe(client, test) for test in test_cases))
+
     print("\n" + "="*70)
     print("Testing complete! Check the generated test images to see which worked.")
     print("="*70 + "\n")
\ No newline at end of file
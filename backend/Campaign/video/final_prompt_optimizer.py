@@ -111,10 +111,10 @@ def optimize_video_prompts_batch(
     Optimize the final video generation prompts for the following list of scenes.
     
     --- SCENE DRAFT INPUT ---
-    {json.dumps(scene_drafts_for_llm, indent=2)}
-    
+    {json.dumps(scene_drafts_for_llm)}
+
     --- GLOBAL AESTHETICS (VIDEO BIBLE) ---
-    {video_bible.model_dump_json(indent=2)}
+    {video_bible.model_dump_json()}
 """
     
     # 3. Call the Gemini API (ONE SINGLE CALL)
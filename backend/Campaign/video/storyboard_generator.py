@@ -1,4 +1,8 @@
+import asyncio
+import functools
+import io
 import json
+import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
 from pydantic import BaseModel, ValidationError
 from google import genai
@@ -50,45 +54,45 @@ class StoryboardOutput(BaseModel):
 
 # --- 2. Utility Function: Reconstruct Text and Find Time (Simplified Logic) ---
 
-def reconstruct_and_find_time(full_text: str,timestamps: List[Timestamp], start_idx: int, end_idx: int) -> Tuple[str, float, float]:
+def reconstruct_and_find_time(script_words: List[str], starts: np.ndarray, ends: np.ndarray,
+                              start_idx: int, end_idx: int) -> Tuple[str, float, float]:
     """
     Reconstructs the narration text for a scene and finds its precise start/end time.
     Uses the indices provided by the LLM output.
-    
+
+    Timing comes from precomputed SoA arrays (one float64 array each for
+    starts and ends, built once per storyboard), so each scene lookup is
+    two integer indexes instead of attribute walks over Timestamp objects.
+
     Returns: (narration_text, start_time, end_time)
     """
-    
+
     # Ensure indices are within bounds
-    if not timestamps or start_idx >= len(timestamps) or end_idx < start_idx:
+    if len(starts) == 0 or start_idx >= len(starts) or end_idx < start_idx:
         return "", 0.0, 0.0
 
-    # The slice is inclusive of the end index (end_idx + 1)
-    # We take min with len(timestamps) to safely handle the final word/out-of-bounds error
-    scene_timestamps = timestamps[start_idx : min(end_idx + 1, len(timestamps))]
-    
-    if not scene_timestamps:
-        return "", 0.0, 0.0
+    # The slice is inclusive of the end index; clamp to safely handle the
+    # final word/out-of-bounds error
+    last_idx = min(end_idx, len(ends) - 1)
 
-    narration_text = " ".join([t.word for t in scene_timestamps])
-    
-    # Clean up common punctuation spacing issues created by TTS processing
-    # This is a necessary evil if the TTS output still includes this artifact.
-    original_script_words = full_text.split()
-    scene_words = original_script_words[start_idx : min(end_idx + 1, len(original_script_words))]
+    # Clean up common punctuation spacing issues created by TTS processing.
+    # script_words is split once by the caller rather than per scene.
+    scene_words = script_words[start_idx : min(end_idx + 1, len(script_words))]
     narration_text = " ".join(scene_words)
-    
-    start_time = scene_timestamps[0].start
-    end_time = scene_timestamps[-1].end
-    
-    return narration_text, start_time, end_time
+
+    return narration_text, float(starts[start_idx]), float(ends[last_idx])
 
 
 # --- 3. Modular Function: System Prompt for Gemini (The Scene Planner) ---
 
+@functools.lru_cache(maxsize=128)
 def get_storyboard_system_for_gemini(target_scenes: int, total_duration: float) -> str:
     """
-    Returns the system prompt for generating the storyboard and visual prompts, 
+    Returns the system prompt for generating the storyboard and visual prompts,
     requiring the LLM to output word indices only.
+
+    Memoized: callers pass total_duration rounded to 0.1s so repeat
+    generations with near-identical audio reuse the same ~2KB string.
     """
     return """
 You are a world-class **Video Storyboard Artist and Generative Video Prompt Engineer**.
@@ -124,7 +128,7 @@ SCHEMA (MUST BE FOLLOWED):
 
 # --- 4. Main Storyboard Generation Function (Corrected Logic) ---
 
-def generate_storyboard(
+async def generate_storyboard(
     full_narration_text: str,
     timestamps_output: AudioTimestampOutput, # Used real production type
     video_bible_output: VideoBibleOutput,    # Used real production type
@@ -132,36 +136,35 @@ def generate_storyboard(
     gemini_client: genai.Client,
 ) -> StoryboardOutput:
     """
-    Generates a detailed, continuity-aware storyboard using Gemini and post-processes 
+    Generates a detailed, continuity-aware storyboard using Gemini and post-processes
     it in Python to insert accurate timing data.
+
+    Async so callers can overlap this Gemini call with other pipeline work;
+    the blocking SDK call itself runs on a worker thread.
     """
     
     if not gemini_client:
         raise HTTPException(status_code=500, detail="Gemini Client is not initialized.")
     
     total_duration = timestamps_output.timestamps[-1].end
-    if total_duration <= 30:
-        dynamic_max_tokens = 8192
-    elif total_duration <= 60:
-        dynamic_max_tokens = 8192
-    elif total_duration <= 120:
-        dynamic_max_tokens = 65536 
-    else:
-         
-        dynamic_max_tokens = 65536 
+    # The old four-branch ladder only ever produced these two values
+    dynamic_max_tokens = 8192 if total_duration <= 60 else 65536
 
     print(f"🎬 Video Duration: {total_duration:.2f}s | Setting Max Tokens to: {dynamic_max_tokens}")
 
     target_count = max(1, math.ceil(total_duration / 3.5))
-    llm_system_prompt = get_storyboard_system_for_gemini(target_count, total_duration)
+    llm_system_prompt = get_storyboard_system_for_gemini(target_count, round(total_duration, 1))
     # A. Calculate Target Scene Count (Standard is ~3.5s per scene)
      
-    # 2. Construct the full prompt payload for Gemini
-    timestamp_data_list = "\n".join(
-        f"{i} : {t.word} : {t.start} : {t.end}" 
+    # 2. Construct the full prompt payload for Gemini.
+    # StringIO keeps this a single growing buffer; the old print()s of the
+    # timing block and full prompt pushed tens of KB through stdout per call
+    buf = io.StringIO()
+    buf.writelines(
+        f"{i} : {t.word} : {t.start} : {t.end}\n"
         for i, t in enumerate(timestamps_output.timestamps)
     )
-    print(timestamp_data_list)
+    timestamp_data_list = buf.getvalue()
     # Pass all raw data that the LLM needs to make decisions on scene breaks and visuals
     llm_user_prompt = f"""
 Analyze the following data to create the continuity-focused Storyboard JSON.
@@ -172,21 +175,19 @@ FULL NARRATION TEXT: {full_narration_text}
 {timestamp_data_list}
     
 --- GLOBAL VIDEO AESTHETICS (for style/mood of visuals) ---
-{video_bible_output.model_dump_json(indent=2)}
-    
+{video_bible_output.model_dump_json()}
+
 --- CONTENT GUIDELINES (for scene focus/value) ---
-{analysis_brief.model_dump_json(indent=2)}
+{analysis_brief.model_dump_json()}
 """
-    print(llm_user_prompt)
-    total_duration = timestamps_output.timestamps[-1].end
- 
     # 3. Call the Gemini API
     try:
-        response = gemini_client.models.generate_content(
+        response = await asyncio.to_thread(
+            gemini_client.models.generate_content,
             model='gemini-2.0-flash',
             contents=[llm_system_prompt, llm_user_prompt],
             config=types.GenerateContentConfig(
-                response_mime_type="application/json", 
+                response_mime_type="application/json",
                 temperature=0.4,
                 max_output_tokens=dynamic_max_tokens
             )
@@ -198,12 +199,20 @@ FULL NARRATION TEXT: {full_narration_text}
         # 4. POST-PROCESSING: Calculate precise timing and narration in Python
         final_scenes: List[Scene] = []
         
+        # AoS -> SoA: lift the word timings out of the Pydantic objects once,
+        # then every scene lookup below is pure array indexing
+        ts = timestamps_output.timestamps
+        word_starts = np.fromiter((t.start for t in ts), dtype=np.float64, count=len(ts))
+        word_ends = np.fromiter((t.end for t in ts), dtype=np.float64, count=len(ts))
+        script_words = full_narration_text.split()
+
         for draft in llm_draft_output.scene_drafts:
             # Python calculates the precise timing using the LLM's provided indices
             narration, start_time, end_time = reconstruct_and_find_time(
-                full_text=full_narration_text,
-                timestamps=timestamps_output.timestamps, 
-                start_idx=draft.start_word_index, 
+                script_words=script_words,
+                starts=word_starts,
+                ends=word_ends,
+                start_idx=draft.start_word_index,
                 end_idx=draft.end_word_index
             )
             duration = end_time - start_time
@@ -4,6 +4,8 @@ Converts word-level timestamps into semantic SRT subtitle blocks.
 Includes path sanitation for FFmpeg compatibility.
 """
 import os
+import operator
+import platform
 from pathlib import Path
 from typing import List
 from pydantic import BaseModel
@@ -16,12 +18,18 @@ from Campaign.video.audio_generator_elevenlabs import Timestamp
 # SRT FORMATTING LOGIC
 # =============================================================================
 
+# End-of-thought characters checked against the last character of each word
+_PUNCT = frozenset(".!?;")
+
+
 def format_to_srt_time(seconds: float) -> str:
     """Converts seconds (float) to SRT timestamp: HH:MM:SS,mmm"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    millis = int((seconds % 1) * 1000)
+    # One float->int truncation, then integer divmod — avoids four separate
+    # float modulo/division chains per block boundary
+    whole = int(seconds)
+    millis = int((seconds - whole) * 1000)
+    hours, rem = divmod(whole, 3600)
+    minutes, secs = divmod(rem, 60)
     return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
 
 # =============================================================================
@@ -46,21 +54,26 @@ def generate_srt(
     current_chunk = []
     chunk_index = 1
 
+    # Local attrgetters skip the Pydantic attribute machinery in the loop
+    get_word = operator.attrgetter("word")
+    get_start = operator.attrgetter("start")
+    get_end = operator.attrgetter("end")
+
     for i, ts in enumerate(timestamps):
         current_chunk.append(ts)
-        
+
         # Semantic Break Detection:
         # 1. Word limit reached
         # 2. Punctuation signifies end of thought
         # 3. End of list
-        has_punctuation = any(char in ts.word for char in [".", "!", "?", ";"])
-        
+        has_punctuation = get_word(ts)[-1:] in _PUNCT
+
         if len(current_chunk) >= max_words or has_punctuation or i == len(timestamps) - 1:
-            start_time = format_to_srt_time(current_chunk[0].start)
-            end_time = format_to_srt_time(current_chunk[-1].end)
-            
+            start_time = format_to_srt_time(get_start(current_chunk[0]))
+            end_time = format_to_srt_time(get_end(current_chunk[-1]))
+
             # Join words
-            text = " ".join([w.word for w in current_chunk])
+            text = " ".join(map(get_word, current_chunk))
             
             # Create SRT block
             block = f"{chunk_index}\n{start_time} --> {end_time}\n{text}\n\n"
@@ -83,22 +96,23 @@ def generate_srt(
 # FFMPEG PATH SANITIZER
 # =============================================================================
 
+# Cached at import: the platform doesn't change at runtime, so no per-call
+# platform.system() lookup. One translate pass replaces the two .replace passes.
+_IS_WINDOWS = platform.system() == "Windows"
+_FFMPEG_TABLE = str.maketrans({"\\": "/", " ": "\\ "})
+
+
 def get_ffmpeg_compatible_path(path: str) -> str:
     """
     Sanitizes absolute paths for FFmpeg's 'subtitles' filter.
     Handles Windows drive letters, backslashes, and SPACES.
     """
-    import platform
-    
-    # Convert backslashes to forward slashes
-    path = path.replace("\\", "/")
-    
+    # Convert backslashes to forward slashes and escape spaces in one pass
+    path = path.translate(_FFMPEG_TABLE)
+
     # Handle Windows drive letter (C:, D:, etc.)
-    if platform.system() == "Windows" and len(path) > 1 and path[1] == ":":
+    if _IS_WINDOWS and len(path) > 1 and path[1] == ":":
         # Escape ONLY the drive colon
         path = path[0] + "\\:" + path[2:]
-    
-    # Escape spaces for FFmpeg filter syntax
-    path = path.replace(" ", "\\ ")
-    
+
     return path
\ No newline at end of file
@@ -1,5 +1,7 @@
+import asyncio
 import json
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, ValidationError
 from google import genai
 from google.genai import types
@@ -35,9 +37,9 @@ class VideoBibleOutput(BaseModel):
 
 # --- 2. Modular Function: System Prompt for Gemini ---
 
-def get_video_bible_system_for_gemini() -> str:
-    """Returns the system prompt for generating the global video identity."""
-    return """
+# Built once at import — the prompt is a ~2KB constant, no reason to
+# reallocate it per video
+_VIDEO_BIBLE_SYSTEM = """
 You are a world-class **Video Director and Aesthetic Consultant**. Your task is to analyze the provided 
 Strategic Brief and generate a concise, detailed JSON object called "video_bible" that defines 
 the global aesthetic identity and constraints for a video.
@@ -72,9 +74,48 @@ SCHEMA (MUST BE FOLLOWED):
 }
 """
 
+
+def get_video_bible_system_for_gemini() -> str:
+    """Returns the system prompt for generating the global video identity."""
+    return _VIDEO_BIBLE_SYSTEM
+
+
+# Server-side context cache for the system prompt: repeat calls within the
+# TTL skip re-prefilling it. Not every model/prompt size qualifies (Gemini
+# enforces a minimum cached token count), so creation failure falls back to
+# sending the prompt inline and is not retried per call.
+_CACHE_TTL_S = 3600
+_bible_cache_name: Optional[str] = None
+_bible_cache_expires_at = 0.0
+_bible_cache_disabled = False
+
+
+def _get_bible_cache(gemini_client: genai.Client) -> Optional[str]:
+    global _bible_cache_name, _bible_cache_expires_at, _bible_cache_disabled
+    if _bible_cache_disabled:
+        return None
+    now = time.time()
+    if _bible_cache_name and now < _bible_cache_expires_at - 60:
+        return _bible_cache_name
+    try:
+        cache = gemini_client.caches.create(
+            model='gemini-2.0-flash',
+            config=types.CreateCachedContentConfig(
+                contents=[_VIDEO_BIBLE_SYSTEM],
+                ttl=f"{_CACHE_TTL_S}s",
+            ),
+        )
+        _bible_cache_name = cache.name
+        _bible_cache_expires_at = now + _CACHE_TTL_S
+        print("♻️ Video bible system prompt cached server-side")
+    except Exception as e:
+        _bible_cache_disabled = True
+        print(f"⚠️ Gemini context cache unavailable, sending prompt inline: {e}")
+    return _bible_cache_name
+
 # --- 3. Main Generation Function ---
 
-def generate_video_bible(
+async def generate_video_bible(
     analysis_brief:  ResearchAnalysis, # Use ResearchAnalysis in your production code
     initial_keywords: List[str],
     gemini_client: genai.Client,
@@ -82,6 +123,9 @@ def generate_video_bible(
 ) -> VideoBibleOutput:
     """
     Generates the Video Bible (global constraints and aesthetics) using the Gemini API.
+
+    Async so it can be gathered with other pipeline LLM calls; the blocking
+    SDK call runs on a worker thread.
     """
     
     if not gemini_client:
@@ -95,16 +139,29 @@ def generate_video_bible(
     Analyze the following data to create the required JSON output:
     
     ORIGINAL USER TOPIC: {original_topic}
-    STRATEGIC BRIEF: {analysis_brief.model_dump_json(indent=2)}
+    STRATEGIC BRIEF: {analysis_brief.model_dump_json()}
     INITIAL KEYWORDS: {json.dumps(initial_keywords)}
 """
     
-    # 3. Call the Gemini API
+    # 3. Call the Gemini API — with the system prompt served from the
+    # server-side context cache when available
     try:
-        response = gemini_client.models.generate_content(
+        cache_name = await asyncio.to_thread(_get_bible_cache, gemini_client)
+        if cache_name:
+            contents = [llm_user_prompt]
+            config = types.GenerateContentConfig(
+                response_mime_type="application/json", temperature=0.3,
+                cached_content=cache_name)
+        else:
+            contents = [llm_system_prompt, llm_user_prompt]
+            config = types.GenerateContentConfig(
+                response_mime_type="application/json", temperature=0.3)
+
+        response = await asyncio.to_thread(
+            gemini_client.models.generate_content,
             model='gemini-2.0-flash', # Fast and reliable for JSON synthesis
-            contents=[llm_system_prompt, llm_user_prompt],
-            config=types.GenerateContentConfig(response_mime_type="application/json", temperature=0.3)
+            contents=contents,
+            config=config
         )
         
         raw_json_text = response.text.strip()
@@ -1,6 +1,8 @@
-import json
-from typing import List, Dict, Any , Tuple
-from pydantic import BaseModel, ValidationError
+import functools
+import orjson
+import time
+from typing import List, Dict, Any, Optional, Tuple
+from pydantic import BaseModel, TypeAdapter, ValidationError
 from google import genai
 from google.genai import types
 from fastapi import HTTPException
@@ -21,8 +23,15 @@ class ScriptOutput(BaseModel):
     estimated_duration_s: int
 
 
+# Warmed once at import: validate_json goes straight from Gemini's raw JSON
+# text to the model through pydantic-core's Rust parser, skipping the
+# json.loads + dict-unpacking step of ScriptOutput(**data).
+_SCRIPT_ADAPTER = TypeAdapter(ScriptOutput)
+
+
 # --- 2. Modular Function: Word Count Calculation ---
 
+@functools.lru_cache(maxsize=128)
 def calculate_target_word_count_from_seconds(total_seconds: int) -> int:
     """
     Calculates the required word count based on a 150 WPM rate (2.5 WPS).
@@ -33,13 +42,18 @@ def calculate_target_word_count_from_seconds(total_seconds: int) -> int:
 
 # --- 3. Modular Function: System Prompt for Gemini ---
 
+@functools.lru_cache(maxsize=128)
 def get_script_system_for_gemini(word_count: int) -> str:
-    """Returns the system prompt for generating the full video narration script."""
+    """Returns the system prompt for generating the full video narration script.
+
+    Pure function of word_count, so repeat durations within a campaign
+    reuse the cached ~2KB string instead of re-formatting it.
+    """
     return f"""
 You are a world-class **Scriptwriter and Copywriter** specializing in short, compelling video advertisements and brand content.
 Your task is to analyze the provided Strategic Brief and Video Bible to create a single, cohesive, and powerful narration script.
 
-Your output MUST be a single JSON object that **strictly conforms** to the specified SCHEMA. Do not include any other text, reasoning, or markdown outside the JSON block.
+Your output MUST be a single JSON object. Do not include any other text, reasoning, or markdown outside the JSON block.
 
 ---
 INSTRUCTIONS:
@@ -48,16 +62,42 @@ INSTRUCTIONS:
 3.  **Aesthetic Integration:** The tone, vocabulary, and rhythm of the script must strongly align with the 'mood', 'visual_style', and 'camera_style' defined in the VIDEO BIBLE. (e.g., if mood is 'premium' and 'calm', the language should be elegant and flowing, not frenetic).
 4.  **Content Focus:** The script must use the 'video_content_concept' as its core idea and naturally lead to the 'primary_call_to_action' from the STRATEGIC BRIEF.
 5.  **Formatting:** The 'full_narration' should be plain text (no line breaks, no scene cues, no markdown formatting like bolding or italics), ready to be fed directly into a Text-to-Speech engine.
----
-SCHEMA:
-{{
-  "video_title": "string",
-  "full_narration": "string",
-  "target_word_count": "integer",
-  "estimated_duration_s": "integer"
-}}
 """
 
+# Server-side context caches for the system prompt, keyed by word count
+# (the only thing the prompt varies on). Same contract as the video-bible
+# cache: creation failure (e.g. below Gemini's minimum cached token count)
+# falls back to inlining the prompt and is not retried per call.
+_SCRIPT_CACHE_TTL_S = 3600
+_script_caches: Dict[int, Tuple[str, float]] = {}
+_script_cache_disabled = False
+
+
+def _get_script_cache(gemini_client: genai.Client, word_count: int) -> Optional[str]:
+    global _script_cache_disabled
+    if _script_cache_disabled:
+        return None
+    now = time.time()
+    entry = _script_caches.get(word_count)
+    if entry and now < entry[1] - 60:
+        return entry[0]
+    try:
+        cache = gemini_client.caches.create(
+            model='gemini-2.5-flash',
+            config=types.CreateCachedContentConfig(
+                system_instruction=get_script_system_for_gemini(word_count),
+                ttl=f"{_SCRIPT_CACHE_TTL_S}s",
+            ),
+        )
+        _script_caches[word_count] = (cache.name, now + _SCRIPT_CACHE_TTL_S)
+        print(f"♻️ Script system prompt cached server-side (wc={word_count})")
+        return cache.name
+    except Exception as e:
+        _script_cache_disabled = True
+        print(f"⚠️ Gemini context cache unavailable, sending prompt inline: {e}")
+        return None
+
+
 # --- 4. Main Generation Function ---
 
 def generate_video_script(
@@ -65,10 +105,15 @@ def generate_video_script(
     analysis_brief: ResearchAnalysis , # Use ResearchAnalysis in your production code
     duration_seconds: int,
     gemini_client: genai.Client,
-    original_topic: str = ""
+    original_topic: str = "",
+    _brief_json: Optional[str] = None,
+    _bible_json: Optional[str] = None,
 ) -> ScriptOutput:
     """
     Generates the full narration script, controlling for word count based on duration.
+
+    _brief_json/_bible_json let generate_video_scripts_for_brief pass in
+    already-serialized models so variants don't re-walk the model tree.
     """
     
     if not gemini_client:
@@ -79,40 +124,208 @@ def generate_video_script(
     total_s = duration_seconds
     
     llm_system_prompt = get_script_system_for_gemini(target_wc)
-    
-    # 2. Construct the full prompt payload for Gemini
+
+    # 2. Construct the full prompt payload for Gemini. Unindented JSON:
+    # the whitespace only costs input tokens, the model doesn't need it.
+    if _brief_json is None:
+        _brief_json = analysis_brief.model_dump_json()
+    if _bible_json is None:
+        _bible_json = video_bible_output.model_dump_json()
+
     llm_user_prompt = f"""
     Generate the full narration script. Adhere strictly to the word count constraint of {target_wc} words.
 
     ORIGINAL USER TOPIC: {original_topic}
     VIDEO DURATION REQUESTED: {total_s} seconds
-    
+
     --- STRATEGIC CONTENT (for content/CTA) ---
-    {analysis_brief.model_dump_json(indent=2)}
-    
+    {_brief_json}
+
     --- GLOBAL VIDEO AESTHETICS (for tone/style) ---
-    {video_bible_output.model_dump_json(indent=2)}
+    {_bible_json}
 """
     
-    # 3. Call the Gemini API
+    # 3. Call the Gemini API — system prompt served from the context cache
+    # when available so repeated calls only pay for the user prompt
     try:
-        response = gemini_client.models.generate_content(
-            model='gemini-2.5-flash', 
-            contents=[llm_system_prompt, llm_user_prompt],
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json", 
-                temperature=0.7 # Higher temperature for creative scriptwriting
+        cache_name = _get_script_cache(gemini_client, target_wc)
+        if cache_name:
+            contents = [llm_user_prompt]
+            config = types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=ScriptOutput,  # constrained decoding: output always parses
+                temperature=0.7, # Higher temperature for creative scriptwriting
+                cached_content=cache_name
             )
+        else:
+            contents = [llm_system_prompt, llm_user_prompt]
+            config = types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=ScriptOutput,
+                temperature=0.7
+            )
+
+        response = gemini_client.models.generate_content(
+            model='gemini-2.5-flash',
+            contents=contents,
+            config=config
         )
         
-        raw_json_text = response.text.strip()
-        output_data = json.loads(raw_json_text)
-        
-        # Add the target and duration to the final Pydantic model for verification/tracking
-        output_data['target_word_count'] = target_wc
-        output_data['estimated_duration_s'] = total_s
-        
-        return ScriptOutput(**output_data)
+        # The SDK hands back a parsed ScriptOutput when response_schema is
+        # honoured; fall back to validating the raw text otherwise
+        if isinstance(response.parsed, ScriptOutput):
+            script = response.parsed
+        else:
+            raw_json_text = response.text.strip()
+            script = _SCRIPT_ADAPTER.validate_json(raw_json_text)
+
+        # Pin the target and duration on the final model for verification/tracking
+        return script.model_copy(update={
+            'target_word_count': target_wc,
+            'estimated_duration_s': total_s,
+        })
         
     except Exception as e:
-        raise ValueError(f"Gemini API or JSON generation failed during script creation: {e}. Raw output: {raw_json_text if 'raw_json_text' in locals() else 'N/A'}")
\ No newline at end of file
+        raise ValueError(f"Gemini API or JSON generation failed during script creation: {e}. Raw output: {raw_json_text if 'raw_json_text' in locals() else 'N/A'}")
+
+
+def generate_video_scripts_for_brief(
+    video_bible_output: VideoBibleOutput,
+    analysis_brief: ResearchAnalysis,
+    durations: List[int],
+    gemini_client: genai.Client,
+    original_topic: str = ""
+) -> Dict[int, ScriptOutput]:
+    """
+    Generates one script per requested duration from a single brief/bible.
+
+    The two input models are serialized exactly once and reused across
+    every variant, instead of re-walking the model tree per call.
+    Returns a dict mapping duration_seconds -> ScriptOutput.
+    """
+    brief_json = analysis_brief.model_dump_json()
+    bible_json = video_bible_output.model_dump_json()
+    return {
+        duration: generate_video_script(
+            video_bible_output, analysis_brief, duration, gemini_client,
+            original_topic=original_topic,
+            _brief_json=brief_json, _bible_json=bible_json)
+        for duration in durations
+    }
+
+
+# --- 5. Batched Generation (variants / A-B tests / multi-duration cuts) ---
+
+class ScriptJob(BaseModel):
+    """One script request inside a batch submission."""
+    job_id: str
+    video_bible_output: VideoBibleOutput
+    analysis_brief: ResearchAnalysis
+    duration_seconds: int
+    original_topic: str = ""
+
+
+_BATCH_TERMINAL_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED"}
+
+
+def generate_video_scripts_batch(
+    jobs: List[ScriptJob],
+    gemini_client: genai.Client,
+    poll_interval_s: float = 10.0,
+    timeout_s: float = 1800.0,
+) -> Dict[str, ScriptOutput]:
+    """
+    Generates N scripts through the Gemini Batch API in one submission.
+
+    Batch requests are billed at half price and scheduled together by
+    Google, so campaigns that need several scripts (variants, multiple
+    durations) avoid N serial round trips. The synchronous
+    generate_video_script path stays for one-off interactive use.
+
+    Returns a dict mapping job_id -> ScriptOutput for every job that
+    completed successfully.
+    """
+    if not jobs:
+        return {}
+    if not gemini_client:
+        raise HTTPException(status_code=500, detail="Gemini Client is not initialized.")
+
+    # 1. Build the JSONL request file, one keyed request per job
+    lines = []
+    targets = {}
+    for job in jobs:
+        target_wc = calculate_target_word_count_from_seconds(job.duration_seconds)
+        targets[job.job_id] = (target_wc, job.duration_seconds)
+        llm_system_prompt = get_script_system_for_gemini(target_wc)
+        llm_user_prompt = f"""
+    Generate the full narration script. Adhere strictly to the word count constraint of {target_wc} words.
+
+    ORIGINAL USER TOPIC: {job.original_topic}
+    VIDEO DURATION REQUESTED: {job.duration_seconds} seconds
+
+    --- STRATEGIC CONTENT (for content/CTA) ---
+    {job.analysis_brief.model_dump_json()}
+
+    --- GLOBAL VIDEO AESTHETICS (for tone/style) ---
+    {job.video_bible_output.model_dump_json()}
+"""
+        lines.append(orjson.dumps({
+            "key": job.job_id,
+            "request": {
+                "contents": [
+                    {"parts": [{"text": llm_system_prompt}]},
+                    {"parts": [{"text": llm_user_prompt}]},
+                ],
+                "generation_config": {
+                    "response_mime_type": "application/json",
+                    "response_schema": ScriptOutput.model_json_schema(),
+                    "temperature": 0.7,
+                },
+            },
+        }))
+
+    import tempfile
+    import time as _time
+
+    try:
+        with tempfile.NamedTemporaryFile("wb", suffix=".jsonl", delete=False) as f:
+            f.write(b"\n".join(lines))
+            jsonl_path = f.name
+
+        # 2. Upload and submit
+        uploaded = gemini_client.files.upload(file=jsonl_path)
+        batch = gemini_client.batches.create(model='gemini-2.5-flash', src=uploaded.name)
+
+        # 3. Poll until the batch reaches a terminal state
+        deadline = _time.monotonic() + timeout_s
+        while batch.state.name not in _BATCH_TERMINAL_STATES:
+            if _time.monotonic() > deadline:
+                raise TimeoutError(f"Batch {batch.name} still {batch.state.name} after {timeout_s}s")
+            _time.sleep(poll_interval_s)
+            batch = gemini_client.batches.get(name=batch.name)
+
+        if batch.state.name != "JOB_STATE_SUCCEEDED":
+            raise ValueError(f"Batch {batch.name} ended in state {batch.state.name}")
+
+        # 4. Download and key the results back to ScriptOutput models
+        result_bytes = gemini_client.files.download(file=batch.dest.file_name)
+        scripts: Dict[str, ScriptOutput] = {}
+        for line in result_bytes.splitlines():
+            if not line.strip():
+                continue
+            row = orjson.loads(line)
+            job_id = row.get("key")
+            try:
+                text = row["response"]["candidates"][0]["content"]["parts"][0]["text"]
+                script = _SCRIPT_ADAPTER.validate_json(text.strip())
+                target_wc, total_s = targets[job_id]
+                scripts[job_id] = script.model_copy(update={
+                    'target_word_count': target_wc,
+                    'estimated_duration_s': total_s,
+                })
+            except Exception as e:
+                print(f"❌ Batch script {job_id} failed to parse: {e}")
+        return scripts
+
+    except Exception as e:
+        raise ValueError(f"Gemini Batch API failed during script creation: {e}")
\ No newline at end of file
@@ -1,20 +1,28 @@
 import os
-import requests
+import sys
+import asyncio
+import httpx
+import mimetypes
 import secrets
 import logging
 from typing import Optional, List, Dict, Any
 from urllib.parse import urlencode
 from fastapi import HTTPException, Request
 from datetime import datetime
-import json # Import json for response debugging
+import orjson
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 # 1. Absolute Imports from root config
 from  config import DATA_ROOT, MEDIA_ROOT
 from config import get_wordpress_credentials
+from Campaign.http_client import get_shared_client
 
 CLIENT_ID, CLIENT_SECRET = get_wordpress_credentials()
-# Configure logging for better debugging
+# Configure logging for better debugging. Publish loops are chatty, so the
+# per-call detail sits at DEBUG and production can gate it via WP_LOG_LEVEL.
 logger = logging.getLogger(__name__)
+logger.setLevel(os.environ.get('WP_LOG_LEVEL', 'INFO'))
 REDIRECT_URI = "http://localhost:8000/callback"
 # Add validation:
 if not CLIENT_ID or not CLIENT_SECRET:
@@ -28,55 +36,115 @@ MEDIA_API_TEMPLATE = "https://public-api.wordpress.com/rest/v1.1/sites/{blog_id}
 POST_API_BASE_TEMPLATE = "https://public-api.wordpress.com/rest/v1.1/sites/{blog_id}/posts/{post_id}"
 WP_CREDENTIALS_PATH = DATA_ROOT / "wp_token_store.json"
 
+# Newer image formats missing from some stdlib mimetypes tables
+mimetypes.add_type('image/webp', '.webp')
+mimetypes.add_type('image/avif', '.avif')
+
+# WordPress.com's edge occasionally returns transient 502/503/504; retry
+# those (and dropped connections) with short backoff before surfacing the
+# failure — the async equivalent of mounting urllib3's Retry on a Session.
+_RETRY_STATUSES = {502, 503, 504}
+_MAX_POST_ATTEMPTS = 3
+
+
+async def _wp_post(url: str, *, headers: Dict[str, str], timeout: float,
+                   json: Optional[dict] = None, data: Optional[dict] = None,
+                   files: Optional[dict] = None) -> httpx.Response:
+    """POST to the WP API over the shared pooled client, retrying transient failures.
+
+    JSON payloads are pre-encoded with orjson rather than re-serialized
+    by httpx's stdlib encoder on every attempt.
+    """
+    content = orjson.dumps(json) if json is not None else None
+    client = await get_shared_client()
+    for attempt in range(_MAX_POST_ATTEMPTS):
+        try:
+            response = await client.post(url, headers=headers, content=content,
+                                         data=data, files=files, timeout=timeout)
+        except httpx.TransportError:
+            if attempt == _MAX_POST_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(0.3 * (2 ** attempt))
+            continue
+        if response.status_code in _RETRY_STATUSES and attempt < _MAX_POST_ATTEMPTS - 1:
+            await asyncio.sleep(0.3 * (2 ** attempt))
+            continue
+        return response
+    return response
+
+
 # --- HELPER FUNCTIONS (RETAINED) ---
-def save_persistent_credentials(access_token: str, blog_id: str, user_sites: list = None):
+
+# Parsed-credential cache keyed on the store file's mtime: the fallback
+# branch of get_session_data runs on every cold-session request, and the
+# file only changes on (re)connect, so repeat reads skip the parse.
+_creds_cache: Optional[Dict[str, Any]] = None
+_creds_mtime: float = 0.0
+
+
+async def save_persistent_credentials(access_token: str, blog_id: str, user_sites: list = None):
     """Saves credentials to a local file so they stay 'connected' forever."""
+    global _creds_cache
     data = {
         "access_token": access_token,
         "blog_id": blog_id,
         "user_sites": user_sites or []
     }
-    with open(WP_CREDENTIALS_PATH, "w") as f:
-        json.dump(data, f)
+    # Disk write off the event loop so a slow disk can't stall other requests
+    await asyncio.to_thread(WP_CREDENTIALS_PATH.write_bytes, orjson.dumps(data))
+    _creds_cache = None  # force reparse against the new mtime
 
-def get_session_data(request: Request) -> Dict[str, Any]:
+async def get_session_data(request: Request) -> Dict[str, Any]:
     """Safely extract WordPress data, falling back to persistent storage."""
+    global _creds_cache, _creds_mtime
     # 1. Try to get from session first
     data = {
         'access_token': request.session.get('wp_access_token'),
         'blog_id': request.session.get('wp_blog_id'),
         'user_sites': request.session.get('wp_user_sites', [])
     }
-    
-    # 2. If session is empty, check the persistent file
-    if not data['access_token'] and os.path.exists(WP_CREDENTIALS_PATH):
+
+    # 2. If session is empty, fall back to the persistent file. One stat
+    # decides both existence and cache freshness; the read/parse only
+    # happens when the file actually changed.
+    if not data['access_token']:
         try:
-            with open(WP_CREDENTIALS_PATH, "r") as f:
-                stored = json.load(f)
-                # Restore into session for the current request
-                request.session['wp_access_token'] = stored.get('access_token')
-                request.session['wp_blog_id'] = stored.get('blog_id')
-                request.session['wp_user_sites'] = stored.get('user_sites', [])
-                return stored
+            st = os.stat(WP_CREDENTIALS_PATH)
+        except FileNotFoundError:
+            return data
+        try:
+            if _creds_cache is not None and st.st_mtime == _creds_mtime:
+                stored = _creds_cache
+            else:
+                raw = await asyncio.to_thread(WP_CREDENTIALS_PATH.read_bytes)
+                stored = orjson.loads(raw)
+                _creds_cache, _creds_mtime = stored, st.st_mtime
+            # Restore into session for the current request
+            request.session['wp_access_token'] = stored.get('access_token')
+            request.session['wp_blog_id'] = stored.get('blog_id')
+            request.session['wp_user_sites'] = stored.get('user_sites', [])
+            return dict(stored)
         except Exception as e:
             logger.error(f"Failed to read persistent WP credentials: {e}")
-            
+
     return data
 
-def is_wordpress_connected(request: Request) -> bool:
+async def is_wordpress_connected(request: Request) -> bool:
     """Check if access token and blog ID are present in the session."""
-    session_data = get_session_data(request)
+    session_data = await get_session_data(request)
     return bool(session_data['access_token'] and session_data['blog_id'])
 
 def disconnect_wordpress(request: Request) -> Dict[str, str]:
     """Clear WordPress session data and the persistent file."""
+    global _creds_cache, _creds_mtime
     request.session.pop('wp_access_token', None)
     request.session.pop('wp_blog_id', None)
     request.session.pop('wp_user_sites', None)
-    
+
+    _creds_cache, _creds_mtime = None, 0.0
     if os.path.exists(WP_CREDENTIALS_PATH):
         os.remove(WP_CREDENTIALS_PATH)
-        
+
     logger.info("WordPress disconnected and persistent storage cleared")
     return {"status": "success", "message": "WordPress disconnected"}
 
@@ -101,12 +169,12 @@ def get_authorization_url(state: str) -> str:
     auth_url = f"{AUTHORIZATION_URL}?{urlencode(params)}"
     return auth_url
 
-def handle_oauth_callback_exchange(
+async def handle_oauth_callback_exchange(
     code: str,
     state: str,
     expected_state: str
 ) -> Dict[str, str]:
- 
+
     # 1. Verify state
     if not state or state != expected_state:
         raise HTTPException(status_code=400, detail="Invalid or expired OAuth state.")
@@ -121,7 +189,7 @@ def handle_oauth_callback_exchange(
     }
 
     try:
-        response = requests.post(TOKEN_URL, data=token_payload, timeout=10)
+        response = await _wp_post(TOKEN_URL, headers={}, data=token_payload, timeout=10)
         response.raise_for_status()
         token_data = response.json()
         access_token = token_data.get("access_token")
@@ -132,70 +200,100 @@ def handle_oauth_callback_exchange(
             "access_token": access_token,
             "blog_id": str(blog_id)
         }
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
 
         raise HTTPException(status_code=500, detail=f"Failed to exchange token with WordPress: {e}")
 
 # --- CONTENT PUBLISHING FUNCTIONS ---
 
-def upload_image_to_wordpress(
+@dataclass(slots=True)
+class WPSession:
+    """Precomputed endpoints/headers for one (token, blog) pair.
+
+    Formatting the URL templates and building auth-header dicts on every
+    call adds up over a 50-post campaign; this caches them once per session.
+    """
+    access_token: str
+    blog_id: str
+    media_url: str = field(init=False)
+    new_post_url: str = field(init=False)
+    auth_headers: Dict[str, str] = field(init=False)
+    json_headers: Dict[str, str] = field(init=False)
+
+    def __post_init__(self):
+        self.media_url = MEDIA_API_TEMPLATE.format(blog_id=self.blog_id)
+        self.new_post_url = POST_API_BASE_TEMPLATE.format(blog_id=self.blog_id, post_id='new')
+        self.auth_headers = {"Authorization": f"Bearer {self.access_token}"}
+        self.json_headers = {**self.auth_headers, "Content-Type": "application/json"}
+
+    def post_url(self, post_id) -> str:
+        return POST_API_BASE_TEMPLATE.format(blog_id=self.blog_id, post_id=post_id)
+
+
+@lru_cache(maxsize=16)
+def _get_wp_session(access_token: str, blog_id: str) -> WPSession:
+    return WPSession(access_token, blog_id)
+
+
+
+async def upload_image_to_wordpress(
     access_token: str,
     blog_id: str,
     image_path: str
 ) -> Optional[Dict[str, Any]]:
     """Upload a single image to WordPress media library. Returns media ID and URL."""
-    
-    # 3. Use absolute path to ensure file is found in nested structure
+
+    # 3. Use absolute path to ensure file is found in nested structure.
+    # One stat covers the existence check; a second exists() would be a
+    # redundant syscall per upload.
     img_p = Path(image_path).absolute()
-    
-    if not img_p.exists():
-        print(f"❌ ERROR: Media file not found: {img_p}")
-        return None
-    print("\n" + "="*50)
-    print("🖼️ STARTING IMAGE UPLOAD")
-    print("="*50)
-    
-    if not os.path.exists(image_path):
-        print(f"❌ ERROR: Image file not found locally: {image_path}")
+
+    try:
+        await asyncio.to_thread(img_p.stat)
+    except FileNotFoundError:
+        logger.error("Media file not found: %s", img_p)
         return None
-    
-    media_endpoint = MEDIA_API_TEMPLATE.format(blog_id=blog_id)
-    headers = {"Authorization": f"Bearer {access_token}"}
-    
+    logger.info("🖼️ Starting image upload")
+
+    session = _get_wp_session(access_token, blog_id)
+    media_endpoint = session.media_url
+    headers = session.auth_headers
+
     try:
-        with open(image_path, 'rb') as f:
-            filename = os.path.basename(image_path)
-            files = {
-                'media[]': (filename, f, 'image/jpeg') 
-            }
-            
-            print(f"⬆️ Uploading file: {filename} to {media_endpoint}")
-            
-            response = requests.post(media_endpoint, headers=headers, files=files, timeout=30)
-            
-            if response.status_code == 200:
-                media_data = response.json()
-                if 'media' in media_data and media_data['media']:
-                    uploaded = media_data['media'][0]
-                    print(f"✅ Image upload successful. ID: {uploaded.get('ID')}, URL: {uploaded.get('URL')}")
-                    return {'ID': uploaded.get('ID'), 'URL': uploaded.get('URL')}
-                else:
-                    print(f"⚠️ WP Image upload succeeded but media array is empty.")
-                    return None
+        filename = img_p.name
+        content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        image_bytes = await asyncio.to_thread(img_p.read_bytes)
+        files = {
+            'media[]': (filename, image_bytes, content_type)
+        }
+
+        logger.debug("⬆️ Uploading file: %s to %s", filename, media_endpoint)
+
+        response = await _wp_post(media_endpoint, headers=headers, files=files, timeout=30)
+
+        if response.status_code == 200:
+            media_data = response.json()
+            if 'media' in media_data and media_data['media']:
+                uploaded = media_data['media'][0]
+                logger.info("✅ Image upload successful. ID: %s, URL: %s", uploaded.get('ID'), uploaded.get('URL'))
+                return {'ID': uploaded.get('ID'), 'URL': uploaded.get('URL')}
             else:
-                print(f"❌ WP Image upload failed: {response.status_code}")
-                try:
-                    print(f"   Error details: {json.loads(response.text)}")
-                except json.JSONDecodeError:
-                    print(f"   Raw error response: {response.text[:150]}...")
+                logger.warning("WP Image upload succeeded but media array is empty.")
                 return None
+        else:
+            logger.error("WP Image upload failed: %s", response.status_code)
+            try:
+                logger.error("Error details: %s", orjson.loads(response.content))
+            except orjson.JSONDecodeError:
+                logger.error("Raw error response: %.150s...", response.text)
+            return None
     except Exception as e:
-        print(f"❌ ERROR: Exception during image upload: {e}")
+        logger.error("Exception during image upload: %s", e)
         return None
 
 # --- NEW FUNCTION: STEP 1 (CREATE DRAFT) ---
 
-def create_draft_post_to_wordpress(
+async def create_draft_post_to_wordpress(
     request: Request,
     title: str,
     content: str,
@@ -206,11 +304,9 @@ def create_draft_post_to_wordpress(
     This is the first step, separating content generation from user scheduling.
     """
     
-    print("\n" + "="*80)
-    print("🚀 STEP 1: CREATING DRAFT POST")
-    print("="*80)
+    logger.info("🚀 STEP 1: Creating draft post")
     
-    session_data = get_session_data(request)
+    session_data = await get_session_data(request)
     access_token = session_data['access_token']
     blog_id = session_data['blog_id']
     
@@ -220,50 +316,54 @@ def create_draft_post_to_wordpress(
             detail="WordPress not connected. Please authorize your account first."
         )
     
-    # 1. Upload featured image
-    featured_image_id = None
-    featured_image_url = None
-    if featured_image_path:
-        image_data = upload_image_to_wordpress(access_token, blog_id, featured_image_path)
-        if image_data:
-            featured_image_id = image_data['ID']
-            featured_image_url = image_data['URL']
-
-    # 2. Prepare payload for DRAFT creation
-    post_endpoint = POST_API_BASE_TEMPLATE.format(blog_id=blog_id, post_id='new') # Use 'new' for creation
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-    
+    # 1. Prepare payload for DRAFT creation (featured image is linked after)
+    wp = _get_wp_session(access_token, blog_id)
+    post_endpoint = wp.new_post_url
+    headers = wp.json_headers
+
     payload = {
         "title": title,
         "content": content,
         "status": "draft", # <-- CRITICAL: Save as DRAFT
         "format": "standard"
     }
-    
-    if featured_image_id:
-        payload["featured_image"] = str(featured_image_id)
-        
-    print(f"⬆️ Sending draft payload to {post_endpoint}")
-    print(f"   Payload Status: {payload['status']}")
-    print(f"   Title: {payload['title'][:50]}...")
-    
+
+    logger.debug("⬆️ Sending draft payload to %s", post_endpoint)
+    logger.debug("   Payload Status: %s", payload['status'])
+    logger.debug("   Title: %.50s...", payload['title'])
+
     try:
-        response = requests.post(post_endpoint, headers=headers, json=payload, timeout=30)
-        
+        # 2. The image upload and the draft POST are independent until the
+        # featured_image link, so run them concurrently and attach the
+        # media ID with a small follow-up update once both resolve.
+        draft_coro = _wp_post(post_endpoint, headers=headers, json=payload, timeout=30)
+        if featured_image_path:
+            image_data, response = await asyncio.gather(
+                upload_image_to_wordpress(access_token, blog_id, featured_image_path),
+                draft_coro)
+        else:
+            image_data = None
+            response = await draft_coro
+
+        featured_image_url = image_data['URL'] if image_data else None
+
         if response.status_code == 200 or response.status_code == 201:
             post_data = response.json()
             post_id = post_data.get('ID')
             post_url = post_data.get('URL')
-            
+
             if not post_id:
                 raise Exception("WordPress API created a post but did not return an ID.")
-                
-            print(f"✅ Draft created successfully!")
-            print(f"   Post ID: {post_id}")
-            print(f"   Post URL (Draft Preview): {post_url}")
+
+            if image_data:
+                link_endpoint = wp.post_url(post_id)
+                link_response = await _wp_post(
+                    link_endpoint, headers=headers,
+                    json={"featured_image": str(image_data['ID'])}, timeout=30)
+                if link_response.status_code != 200:
+                    logger.warning("Failed to attach featured image to draft: %s", link_response.status_code)
+
+            logger.info("✅ Draft created. Post ID: %s, Preview URL: %s", post_id, post_url)
             
             return {
                 "success": True,
@@ -275,21 +375,20 @@ def create_draft_post_to_wordpress(
             }
         else:
             error_data = response.json()
-            print(f"❌ Draft creation failed: {response.status_code}")
-            print(f"   Error: {error_data}")
+            logger.error("Draft creation failed: %s — %s", response.status_code, error_data)
             raise HTTPException(
                 status_code=response.status_code,
                 detail=error_data.get('message', 'Failed to create blog draft')
             )
-            
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Network error during draft creation: {e}")
+
+    except httpx.HTTPError as e:
+        logger.error("Network error during draft creation: %s", e)
         raise HTTPException(status_code=500, detail=f"Network error: {str(e)}")
 
 
 # --- NEW FUNCTION: STEP 2 (UPDATE/SCHEDULE/TRASH) ---
 
-def update_and_schedule_post(
+async def update_and_schedule_post(
     request: Request,
     post_id: str,
     action: str, # 'schedule', 'publish', or 'trash'
@@ -298,11 +397,9 @@ def update_and_schedule_post(
     """
     Updates the status and schedule of an existing draft post based on user action.
     """
-    print("\n" + "="*80)
-    print(f"📅 STEP 2: HANDLING USER ACTION ({action.upper()}) for Post ID: {post_id}")
-    print("="*80)
+    logger.info("📅 STEP 2: Handling user action (%s) for Post ID: %s", action.upper(), post_id)
 
-    session_data = get_session_data(request)
+    session_data = await get_session_data(request)
     access_token = session_data['access_token']
     blog_id = session_data['blog_id']
     
@@ -329,45 +426,46 @@ def update_and_schedule_post(
             
         status = 'future'
         
-        # Validate/prepare the time for WP API
+        # Validate/prepare the time for WP API. fromisoformat accepts a
+        # trailing 'Z' natively from 3.11, so the replace() is only needed
+        # on older interpreters.
         try:
-            scheduled_dt = datetime.fromisoformat(publish_time.replace('Z', '+00:00'))
-            # The WP API requires ISO 8601 (which publish_time usually is), but often prefers the exact format
-            wp_date_format = scheduled_dt.isoformat().replace('+00:00', '+00:00') 
-            print(f"   Parsed Scheduled Time (UTC): {wp_date_format}")
+            if sys.version_info >= (3, 11):
+                scheduled_dt = datetime.fromisoformat(publish_time)
+            else:
+                scheduled_dt = datetime.fromisoformat(publish_time.replace('Z', '+00:00'))
+            wp_date_format = scheduled_dt.isoformat()
+            logger.debug("Parsed scheduled time (UTC): %s", wp_date_format)
             
             payload = {
                 "status": status,
                 "date": wp_date_format 
             }
         except ValueError as e:
-            print(f"❌ ERROR: Failed to parse schedule time '{publish_time}': {e}")
+            logger.error("Failed to parse schedule time %r: %s", publish_time, e)
             raise HTTPException(status_code=400, detail=f"Invalid date format for scheduling: {publish_time}")
 
     else:
         raise HTTPException(status_code=400, detail=f"Invalid action specified: {action}")
         
     # 2. Send update request
-    post_endpoint = POST_API_BASE_TEMPLATE.format(blog_id=blog_id, post_id=post_id)
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
+    wp = _get_wp_session(access_token, blog_id)
+    post_endpoint = wp.post_url(post_id)
+    headers = wp.json_headers
 
-    print(f"⬆️ Sending update payload to {post_endpoint}")
-    print(f"   Update Payload: {payload}")
+    logger.debug("⬆️ Sending update payload to %s: %s", post_endpoint, payload)
     
     try:
-        response = requests.post(post_endpoint, headers=headers, json=payload, timeout=30)
-        
+        response = await _wp_post(post_endpoint, headers=headers, json=payload, timeout=30)
+
         if response.status_code == 200:
             post_data = response.json()
             actual_status = post_data.get('status')
             
-            print(f"✅ Update successful. New WP Status: {actual_status}")
+            logger.info("✅ Update successful. New WP status: %s", actual_status)
             
             if actual_status == 'publish' and status == 'future':
-                print("⚠️ WARNING: Post published immediately. Scheduled time was likely in the past.")
+                logger.warning("Post published immediately. Scheduled time was likely in the past.")
 
             return {
                 "success": True,
@@ -378,15 +476,14 @@ def update_and_schedule_post(
             }
         else:
             error_data = response.json()
-            print(f"❌ Post update failed: {response.status_code}")
-            print(f"   Error: {error_data}")
+            logger.error("Post update failed: %s — %s", response.status_code, error_data)
             raise HTTPException(
                 status_code=response.status_code,
                 detail=error_data.get('message', f'Failed to update post status to {status}')
             )
-            
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Network error during post update: {e}")
+
+    except httpx.HTTPError as e:
+        logger.error("Network error during post update: %s", e)
         raise HTTPException(status_code=500, detail=f"Network error: {str(e)}")
 
 # Remove the old, combined publish_blog_to_wordpress function
@@ -1,15 +1,24 @@
 from fastapi import Request, HTTPException
 from starlette.responses import RedirectResponse
+import asyncio
+import functools
+import orjson
 import os
-from typing import Optional, Dict, Any
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Tuple
 from  config import (
-    get_youtube_client_id, 
-    get_youtube_client_secret, 
+    DATA_ROOT,
+    get_youtube_client_id,
+    get_youtube_client_secret,
     get_youtube_redirect_uri
 )
 
 os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
 
+import httplib2
+import google_auth_httplib2
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
@@ -38,38 +47,151 @@ CLIENT_CONFIG = {
 }
 
 
+# Persistent token store: survives restarts and lets the background
+# refresh job keep credentials warm (same pattern as the WP token store).
+YT_TOKEN_PATH = DATA_ROOT / "tokens" / "youtube.json"
+os.makedirs(YT_TOKEN_PATH.parent, exist_ok=True)
+
+
+def _token_dict(creds: Credentials) -> Dict[str, Any]:
+    """Serializable snapshot of a credentials object, expiry included."""
+    return {
+        'token': creds.token,
+        'refresh_token': creds.refresh_token,
+        'token_uri': creds.token_uri,
+        'client_id': creds.client_id,
+        'client_secret': creds.client_secret,
+        'scopes': list(creds.scopes or []),
+        'expiry': creds.expiry.isoformat() if creds.expiry else None,
+    }
+
+
+def _persist_token(token_data: Dict[str, Any]) -> None:
+    try:
+        YT_TOKEN_PATH.write_bytes(orjson.dumps(token_data))
+    except OSError as e:
+        print(f"⚠️ Could not persist YouTube token: {e}")
+
+
+def _load_persisted_token() -> Optional[Dict[str, Any]]:
+    try:
+        return orjson.loads(YT_TOKEN_PATH.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+
+def _creds_from_token(token_data: Dict[str, Any]) -> Credentials:
+    creds = Credentials(
+        token=token_data['token'],
+        refresh_token=token_data.get('refresh_token'),
+        token_uri=token_data['token_uri'],
+        client_id=token_data['client_id'],
+        client_secret=token_data['client_secret'],
+        scopes=token_data['scopes']
+    )
+    if token_data.get('expiry'):
+        creds.expiry = datetime.fromisoformat(token_data['expiry']).replace(tzinfo=None)
+    return creds
+
+
+async def refresh_stored_tokens():
+    """Scheduler job: refresh the persisted token before it expires.
+
+    Runs every few minutes so the request path almost never pays the
+    synchronous token_uri round-trip — by the time a publish call needs
+    credentials, they have already been refreshed in the background.
+    """
+    token_data = _load_persisted_token()
+    if not token_data or not token_data.get('refresh_token'):
+        return
+    expiry = token_data.get('expiry')
+    if expiry:
+        expires_at = datetime.fromisoformat(expiry).replace(tzinfo=None)
+        if expires_at - datetime.utcnow() > timedelta(minutes=10):
+            return  # still comfortably valid
+    try:
+        creds = _creds_from_token(token_data)
+        await asyncio.to_thread(creds.refresh, GoogleRequest())
+        _persist_token(_token_dict(creds))
+        print("✅ YouTube token refreshed proactively.")
+    except Exception as e:
+        print(f"⚠️ Background YouTube token refresh failed: {e}")
+
+
+@functools.lru_cache(maxsize=128)
+def _build_service(token: str, refresh_token: Optional[str], token_uri: str,
+                   client_id: str, client_secret: str, scopes: Tuple[str, ...]) -> Any:
+    """build() keyed on the access token: re-parsing the discovery document
+    and standing up a fresh HTTP client per request was pure overhead, and
+    the cached Resource keeps its keep-alive connection to googleapis.com.
+    A token refresh yields a new key, so stale entries age out of the LRU."""
+    creds = Credentials(
+        token=token,
+        refresh_token=refresh_token,
+        token_uri=token_uri,
+        client_id=client_id,
+        client_secret=client_secret,
+        scopes=list(scopes)
+    )
+    # The Resource's built-in transport keeps a keep-alive TLS connection
+    # to googleapis.com for sequential event-loop calls, but httplib2.Http
+    # is NOT thread-safe — anything that can run concurrently must bring
+    # its own transport via _fresh_authorized_http. (googleapiclient is
+    # hard-wired to httplib2, so HTTP/1.1 keep-alive is as far as the
+    # transport goes.)
+    authed_http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=60))
+    # static_discovery: use the discovery doc bundled with the client
+    # library instead of fetching it over HTTPS on a cold build
+    return build('youtube', 'v3', http=authed_http, static_discovery=True)
+
+
+def _fresh_authorized_http(youtube: Any) -> google_auth_httplib2.AuthorizedHttp:
+    """A dedicated transport over the cached service's credentials.
+
+    httplib2.Http keeps one connection per host and interleaves reads and
+    writes when shared across threads, so the concurrent paths — chunked
+    uploads under the semaphore, channel checks while an upload is in
+    flight — pass one of these via execute(http=...) / next_chunk(http=...)
+    instead of using the Resource's built-in transport.
+    """
+    return google_auth_httplib2.AuthorizedHttp(
+        youtube._http.credentials, http=httplib2.Http(timeout=60)
+    )
+
+
 def get_youtube_service(request: Request) -> Optional[Any]:
     """Rebuild YouTube service from session credentials."""
     token_data = request.session.get('youtube_token')
     if not token_data:
-        return None
-    
+        # Fall back to the persistent store (restart survival + the
+        # background job keeps this copy fresh)
+        token_data = _load_persisted_token()
+        if not token_data:
+            return None
+        request.session['youtube_token'] = token_data
+
     try:
-        creds = Credentials(
-            token=token_data['token'],
-            refresh_token=token_data.get('refresh_token'),
-            token_uri=token_data['token_uri'],
-            client_id=token_data['client_id'],
-            client_secret=token_data['client_secret'],
-            scopes=token_data['scopes']
-        )
-        
-        # Refresh if expired
+        creds = _creds_from_token(token_data)
+
+        # Lazy refresh stays as a safety net, but the background job
+        # normally refreshes well before expiry so this rarely fires
         if creds.expired and creds.refresh_token:
             print("⏳ Refreshing YouTube token...")
             creds.refresh(GoogleRequest())
-            # CRITICAL FIX: Save refreshed token back to session
-            request.session['youtube_token'] = {
-                'token': creds.token,
-                'refresh_token': creds.refresh_token,
-                'token_uri': creds.token_uri,
-                'client_id': creds.client_id,
-                'client_secret': creds.client_secret,
-                'scopes': list(creds.scopes)
-            }
+            # CRITICAL FIX: Save refreshed token back to session + store
+            refreshed = _token_dict(creds)
+            request.session['youtube_token'] = refreshed
+            _persist_token(refreshed)
             print("✅ Token refreshed and saved.")
-        
-        return build('youtube', 'v3', credentials=creds)
+
+        return _build_service(
+            creds.token,
+            creds.refresh_token,
+            creds.token_uri,
+            creds.client_id,
+            creds.client_secret,
+            tuple(creds.scopes or ())
+        )
     except Exception as e:
         print(f"❌ Service build failed: {e}")
         return None
@@ -111,16 +233,11 @@ def handle_youtube_oauth_callback(
     try:
         flow.fetch_token(authorization_response=str(request.url))
         creds = flow.credentials
-        
-        # Store in session
-        request.session['youtube_token'] = {
-            'token': creds.token,
-            'refresh_token': creds.refresh_token,
-            'token_uri': creds.token_uri,
-            'client_id': creds.client_id,
-            'client_secret': creds.client_secret,
-            'scopes': list(creds.scopes)
-        }
+
+        # Store in session and the persistent store
+        token_data = _token_dict(creds)
+        request.session['youtube_token'] = token_data
+        _persist_token(token_data)
         request.session.pop('google_oauth_state', None)
         print("✅ YouTube connected successfully!")
         
@@ -132,6 +249,10 @@ def handle_youtube_oauth_callback(
 def disconnect_youtube(request: Request) -> Dict[str, Any]:
     """Disconnect YouTube account."""
     request.session.pop('youtube_token', None)
+    try:
+        YT_TOKEN_PATH.unlink()
+    except FileNotFoundError:
+        pass
     print("🔌 YouTube disconnected")
     return {"success": True, "message": "Disconnected from YouTube"}
 
@@ -153,7 +274,9 @@ def verify_youtube_channel(request: Request) -> Dict[str, Any]:
         }
     
     try:
-        response = youtube.channels().list(part="snippet,statistics", mine=True).execute()
+        response = youtube.channels().list(part="snippet,statistics", mine=True).execute(
+            http=_fresh_authorized_http(youtube)
+        )
         
         if response.get('items'):
             channel = response['items'][0]
@@ -183,6 +306,52 @@ def verify_youtube_channel(request: Request) -> Dict[str, Any]:
         }
 
 
+def batch_verify_channels(youtube_services: List[Any]) -> List[Dict[str, Any]]:
+    """Verify several connected accounts in one multipart/mixed round-trip.
+
+    Each channels().list call costs a full API round-trip; a
+    BatchHttpRequest bundles them so dashboard-style checks over N
+    accounts pay roughly one. (Media uploads cannot be batched — this is
+    for metadata reads only.) Results come back in input order.
+    """
+    if not youtube_services:
+        return []
+
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def _collect(request_id, response, exception):
+        if exception is not None:
+            results[request_id] = {
+                "success": False,
+                "has_channel": False,
+                "message": f"API Error: {exception}"
+            }
+        elif response.get('items'):
+            channel = response['items'][0]
+            results[request_id] = {
+                "success": True,
+                "has_channel": True,
+                "channel_name": channel['snippet']['title'],
+                "channel_id": channel['id'],
+                "subscriber_count": channel['statistics'].get('subscriberCount', '0')
+            }
+        else:
+            results[request_id] = {
+                "success": False,
+                "has_channel": False,
+                "message": "No YouTube channel found. Please create one at youtube.com"
+            }
+
+    batch = youtube_services[0].new_batch_http_request(callback=_collect)
+    for idx, youtube in enumerate(youtube_services):
+        batch.add(
+            youtube.channels().list(part="snippet,statistics", mine=True),
+            request_id=str(idx)
+        )
+    batch.execute(http=_fresh_authorized_http(youtube_services[0]))
+    return [results[str(idx)] for idx in range(len(youtube_services))]
+
+
 def sanitize_youtube_title(title: str, max_length: int = 100) -> str:
     """Sanitize title for YouTube."""
     clean_title = ' '.join(title.split())
@@ -191,15 +360,71 @@ def sanitize_youtube_title(title: str, max_length: int = 100) -> str:
     return clean_title.strip() or "Generated Video"
 
 
-def publish_video_to_youtube(
+# Uploads run in worker threads; progress is tracked here so a separate
+# endpoint can poll it. Cap concurrent uploads so multi-video campaigns
+# don't saturate upstream bandwidth or the quota.
+_upload_progress: Dict[str, int] = {}
+_UPLOAD_SEM = asyncio.Semaphore(2)
+
+
+def get_upload_progress(upload_id: str) -> Optional[int]:
+    """Percent complete for an in-flight upload, or None if unknown."""
+    return _upload_progress.get(upload_id)
+
+
+# Transient statuses worth retrying mid-upload; the resumable protocol
+# resumes from the last acknowledged byte, so a retry never re-sends the
+# chunks that already landed
+_RETRYABLE_UPLOAD_STATUSES = (429, 500, 502, 503, 504)
+_MAX_UPLOAD_RETRIES = 5
+
+
+def _do_chunked_upload(upload_request, upload_id: str, upload_http):
+    """Blocking next_chunk() loop — runs inside a worker thread.
+
+    `upload_http` is a per-upload transport from _fresh_authorized_http:
+    with two uploads allowed concurrently, sharing the cached service's
+    httplib2 connection across worker threads would interleave chunks.
+    """
+    response = None
+    attempt = 0
+    while response is None:
+        try:
+            status, response = upload_request.next_chunk(http=upload_http, num_retries=5)
+        except HttpError as e:
+            if e.resp.status in _RETRYABLE_UPLOAD_STATUSES and attempt < _MAX_UPLOAD_RETRIES - 1:
+                retry_after = e.resp.get('retry-after')
+                delay = float(retry_after) if retry_after else min(2 ** attempt + random.random(), 64)
+                print(f"   ⏳ Transient {e.resp.status} during upload, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+                continue
+            raise
+        attempt = 0  # a successful chunk resets the retry budget
+        if status:
+            pct = int(status.progress() * 100)
+            _upload_progress[upload_id] = pct
+            print(f"   Progress: {pct}%")
+    _upload_progress[upload_id] = 100
+    return response
+
+
+async def publish_video_to_youtube(
     request: Request,
     video_file_path: str,
     title: str,
     description: str = "",
     privacy: str = "unlisted",
-    publish_at: Optional[str] = None
+    publish_at: Optional[str] = None,
+    upload_id: Optional[str] = None
 ) -> Dict[str, Any]:
-    """Upload video to YouTube with optional scheduling."""
+    """Upload video to YouTube with optional scheduling.
+
+    The chunked upload loop runs via asyncio.to_thread so a multi-minute
+    upload no longer blocks the event loop (and every other request).
+    Callers that pass an upload_id can poll get_upload_progress with it
+    while the upload is in flight.
+    """
     youtube = get_youtube_service(request)
     if not youtube:
         raise HTTPException(status_code=401, detail="Not authenticated. Please reconnect.")
@@ -228,19 +453,28 @@ def publish_video_to_youtube(
     
     try:
         print("📤 Starting upload...")
-        media = MediaFileUpload(video_file_path, mimetype='video/mp4', resumable=True, chunksize=1024*1024)
+        # 16 MB chunks (a multiple of Google's required 256 KB): each
+        # next_chunk() is a full HTTPS round-trip, so 1 MB chunks meant 16x
+        # the per-chunk overhead for a typical campaign video
+        media = MediaFileUpload(video_file_path, mimetype='video/mp4', resumable=True, chunksize=16 * 1024 * 1024)
         upload_request = youtube.videos().insert(part="snippet,status", body=video_metadata, media_body=media)
-        
-        response = None
-        while response is None:
-            status, response = upload_request.next_chunk()
-            if status:
-                print(f"   Progress: {int(status.progress() * 100)}%")
-        
+
+        if upload_id is None:
+            upload_id = f"yt_upload_{time.time_ns()}"
+        _upload_progress[upload_id] = 0
+        try:
+            async with _UPLOAD_SEM:
+                response = await asyncio.to_thread(
+                    _do_chunked_upload, upload_request, upload_id,
+                    _fresh_authorized_http(youtube)
+                )
+        finally:
+            _upload_progress.pop(upload_id, None)
+
         video_id = response.get('id')
         video_url = f"https://www.youtube.com/watch?v={video_id}"
         print(f"✅ Upload complete: {video_url}")
-        
+
         return {
             "success": True,
             "message": "Video uploaded successfully",
@@ -0,0 +1,80 @@
+# api_cache.py
+# Shared disk-backed memoization for external API calls.
+
+import functools
+import hashlib
+import os
+from typing import Optional
+
+import diskcache
+import orjson
+
+from config import DATA_ROOT
+
+# One cache for every external service (Tavily, Gemini, Groq, ...). Entries are
+# namespaced by service + function, so different call sites never collide.
+#
+# Behaviour is controlled by the API_CACHE_MODE environment variable:
+#   enabled   (default) - read hits, write misses
+#   readonly            - read hits, never write new entries
+#   writeonly           - always call through, but record results
+#   replay              - read hits, raise ApiCacheMissError on miss
+#   disabled            - bypass the cache entirely
+
+_CACHE = diskcache.Cache(str(DATA_ROOT / "api_cache"), size_limit=10 * 2**30)
+
+_MODE_ENV = "API_CACHE_MODE"
+_VALID_MODES = {"enabled", "readonly", "writeonly", "replay", "disabled"}
+
+
+class ApiCacheMissError(RuntimeError):
+    """Raised in replay mode when a key is not present in the cache."""
+
+
+def _get_mode() -> str:
+    mode = os.getenv(_MODE_ENV, "enabled").lower()
+    return mode if mode in _VALID_MODES else "enabled"
+
+
+def _make_key(service: str, qualname: str, args: tuple, kwargs: dict) -> str:
+    """SHA256 over the service, function and normalized (sorted) arguments."""
+    try:
+        payload = orjson.dumps({"a": args, "k": kwargs}, option=orjson.OPT_SORT_KEYS)
+    except TypeError:
+        # Unserializable argument (e.g. a client object): fall back to repr
+        payload = repr((args, sorted(kwargs.items()))).encode("utf-8")
+    raw = service.encode() + b"||" + qualname.encode() + b"||" + payload
+    return hashlib.sha256(raw).hexdigest()
+
+
+def cached(service: str, ttl: Optional[float] = None, skip_args: int = 0):
+    """
+    Memoizes a function's return value on disk, keyed by its arguments.
+
+    `skip_args` positional arguments are excluded from the key — used for
+    client/handle objects that don't affect the result identity.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            mode = _get_mode()
+            if mode == "disabled":
+                return fn(*args, **kwargs)
+
+            key = _make_key(service, fn.__qualname__, args[skip_args:], kwargs)
+
+            if mode != "writeonly":
+                sentinel = object()
+                hit = _CACHE.get(key, default=sentinel)
+                if hit is not sentinel:
+                    print(f"♻️ {service} cache hit: {fn.__name__}")
+                    return hit
+                if mode == "replay":
+                    raise ApiCacheMissError(f"{service} cache miss for {fn.__qualname__} in replay mode.")
+
+            result = fn(*args, **kwargs)
+            if mode != "readonly":
+                _CACHE.set(key, result, expire=ttl)
+            return result
+        return wrapper
+    return decorator
@@ -9,6 +9,7 @@ from contextlib import asynccontextmanager
 
 # 1. Absolute Imports from root
 from config import initialize_clients, MEDIA_ROOT, DATA_ROOT
+from logging_setup import setup_queue_logging
 from middleware import setup_middleware, setup_static_files
  
 # 2. Corrected Route Imports based on your 'routes/' folder
@@ -16,6 +17,7 @@ from routes import wordpress, content, static, youtube, X
 
 # 3. Corrected Scheduler Import based on your 'Campaign/' folder
 from Campaign.scheduler_service import start_scheduler, stop_scheduler
+from Campaign.http_client import close_shared_client
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -29,6 +31,7 @@ async def lifespan(app: FastAPI):
     # Shutdown: Clean up
     print("\n🛑 Stopping Scheduler...")
     stop_scheduler()
+    await close_shared_client()
     
 # =============================================================================
 # APPLICATION INITIALIZATION
@@ -42,6 +45,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Non-blocking logging for the hot generation paths
+setup_queue_logging()
+
 # Initialize all clients (Groq, Gemini, Tavily)
 print("\n🚀 Initializing API clients...")
 initialize_clients()
@@ -1,3 +1,4 @@
+import functools
 import os
 import uuid
 from pathlib import Path
@@ -27,6 +28,8 @@ BASE_VIDEO_ASSETS_DIR = MEDIA_ROOT / "videos"
 os.makedirs(IMAGE_FOLDER, exist_ok=True)
 os.makedirs(BASE_VIDEO_ASSETS_DIR, exist_ok=True)
 os.makedirs(BASE_VIDEO_ASSETS_DIR / "images", exist_ok=True)
+# Campaign-independent, so created once at startup rather than per campaign
+os.makedirs(MEDIA_ROOT / "personal" / "images", exist_ok=True)
 
 # --- 📁 CAMPAIGN PATH MANAGER ---
 class CampaignPathManager:
@@ -57,11 +60,14 @@ class CampaignPathManager:
             "personal": MEDIA_ROOT / "personal" / "images"
         }
         
-        # Atomically create all required subdirectories
-        for key, path in paths.items():
-            if isinstance(path, Path):
-                os.makedirs(path, exist_ok=True)
-        
+        # Only the deepest leaves need explicit creation — mkdir(parents=True)
+        # builds the intermediate dirs implicitly, so this drops the
+        # per-campaign syscall fan-out from 13 mkdirs to 5. The personal
+        # images dir is campaign-independent and created at startup.
+        for key in ("blog_assets", "long_form_images",
+                    "short_1_images", "short_2_images", "short_3_images"):
+            paths[key].mkdir(parents=True, exist_ok=True)
+
         return paths
     
 
@@ -80,6 +86,9 @@ X_API_KEY = os.getenv("X_API_KEY")
 X_API_KEY_SECRET = os.getenv("X_API_KEY_SECRET") # Matches your .env variable name
 X_REDIRECT_URI = "http://localhost:8000/"
 X_SESSION_KEY = "x_session_id" # Key used in request.session
+# X write cap is ~200 posts / 15 min per user; keep a safety margin by default
+X_POST_RATE_PER_SEC = float(os.getenv("X_POST_RATE_PER_SEC", "0.2"))
+X_POST_BURST = int(os.getenv("X_POST_BURST", "5"))
  
 FIREWORKS_API_KEY_1 = os.getenv("FIREWORKS_API_KEY_1")
 FIREWORKS_API_KEY_2 = os.getenv("FIREWORKS_API_KEY_2")
@@ -96,155 +105,152 @@ if not WORDPRESS_CLIENT_ID or not WORDPRESS_CLIENT_SECRET:
 print(f"DEBUG: X_API_KEY is {'Set' if X_API_KEY else 'None'}")
 print(f"DEBUG: X_API_KEY_SECRET is {'Set' if X_API_KEY_SECRET else 'None'}")
 # --- Client Initialization ---
-groq_client = None
-gemini_client = None
-openrouter_client = None
-tavily_client = None
-elevenlabs_client = None
-fireworks_api_key = None
+# Clients are created lazily on first use. Eager construction at startup
+# paid one TLS handshake/auth validation per client before a single
+# request was served, and allocated clients for features a deployment may
+# never touch; each lru_cache(maxsize=1) getter builds exactly once.
+
+# Per-stage Gemini API keys
+GEMINI_KEYS = {
+    "research": "GEMINI_KEY_STAGE_RESEARCH",
+    "image_prompt": "GEMINI_KEY_STAGE_IMAGE_PROMPT",
+    "blog_prompt": "GEMINI_KEY_STAGE_BLOG_PROMPT",
+    "video_1": "GEMINI_KEY_VIDEO_PIPELINE_1",
+    "video_2": "GEMINI_KEY_VIDEO_PIPELINE_2",
+}
+
+
+# Function to safely initialize a Gemini client
+def _init_gemini_client(key_name):
+    api_key_value = os.getenv(GEMINI_KEYS[key_name])
+    if not api_key_value:
+        print(f"WARNING: API Key for {key_name.upper()} not found in environment.")
+        return None
+    try:
+        # Explicitly pass the API key to ensure the correct key is used
+        client = genai.Client(api_key=api_key_value)
+        print(f"✓ Gemini client for {key_name.capitalize()} initialized.")
+        return client
+    except Exception as e:
+        print(f"Error initializing Gemini Client for {key_name}: {e}")
+        return None
 
 
-# Changing API Key 
-gemini_client_research = None
-gemini_client_image_prompt = None
-gemini_client_blog_prompt = None
-gemini_client_video_1 = None
-gemini_client_video_2 = None
+def initialize_clients():
+    """Validate API configuration at startup.
+
+    Clients themselves are built lazily by the getters below, so this only
+    warns about missing environment variables instead of opening N
+    connections on boot.
+    """
+    if not os.getenv("GROQ_API_KEY"):
+        print("WARNING: GROQ_API_KEY not set.")
+    for key_name, env_var in GEMINI_KEYS.items():
+        if not os.getenv(env_var):
+            print(f"WARNING: API Key for {key_name.upper()} not found in environment.")
+    if not os.getenv("TAVILY_API_KEY"):
+        print("WARNING: TAVILY_API_KEY environment variable not set. Research will be disabled.")
+    if not os.getenv("OPENROUTER_API_KEY"):
+        print("WARNING: OPENROUTER_API_KEY environment variable not set. OpenRouter LLM will be disabled.")
+    if not os.getenv("ELEVENLABS_API_KEY"):
+        print("WARNING: ELEVENLABS_API_KEY not set. Video audio generation will be disabled.")
+    if not os.getenv("FIREWORKS_API_KEY"):
+        print("WARNING: FIREWORKS_API_KEY not set. Video image generation will be disabled.")
 
 
-def initialize_clients():
-    """Initialize all API clients"""
-    global groq_client, gemini_client, tavily_client, elevenlabs_client, fireworks_api_key, openrouter_client
-    global gemini_client_research, gemini_client_image_prompt, gemini_client_blog_prompt, gemini_client_video_1, gemini_client_video_2
-    
+@functools.lru_cache(maxsize=1)
+def get_groq_client():
     try:
-        groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        client = Groq(api_key=os.getenv("GROQ_API_KEY"))
         print("✓ Groq client initialized")
+        return client
     except Exception as e:
         print(f"Error initializing Groq Client: {e}")
-        groq_client = None
-    
-    # 🌟 NEW: Initialize all 5 dedicated Gemini Clients
-    GEMINI_KEYS = {
-        "research": os.getenv("GEMINI_KEY_STAGE_RESEARCH"),
-        "image_prompt": os.getenv("GEMINI_KEY_STAGE_IMAGE_PROMPT"),
-        "blog_prompt": os.getenv("GEMINI_KEY_STAGE_BLOG_PROMPT"),
-        "video_1": os.getenv("GEMINI_KEY_VIDEO_PIPELINE_1"),
-        "video_2": os.getenv("GEMINI_KEY_VIDEO_PIPELINE_2"),
-    }
-
-    # Function to safely initialize a Gemini client
-    def init_gemini_client(key_name, api_key_value):
-        if not api_key_value:
-            print(f"WARNING: API Key for {key_name.upper()} not found in environment.")
-            return None
-        try:
-            # Explicitly pass the API key to ensure the correct key is used
-            client = genai.Client(api_key=api_key_value)
-            print(f"✓ Gemini client for {key_name.capitalize()} initialized.")
-            return client
-        except Exception as e:
-            print(f"Error initializing Gemini Client for {key_name}: {e}")
-            return None
-        
-    gemini_client_research = init_gemini_client("research", GEMINI_KEYS["research"])
-    gemini_client_image_prompt = init_gemini_client("image_prompt", GEMINI_KEYS["image_prompt"])
-    gemini_client_blog_prompt = init_gemini_client("blog_prompt", GEMINI_KEYS["blog_prompt"])
-    gemini_client_video_1 = init_gemini_client("video_1", GEMINI_KEYS["video_1"])
-    gemini_client_video_2 = init_gemini_client("video_2", GEMINI_KEYS["video_2"])
+        return None
+
+@functools.lru_cache(maxsize=1)
+def get_gemini_client():
     try:
-        gemini_client = genai.Client()
+        client = genai.Client()
         print("✓ Gemini client initialized")
+        return client
     except Exception as e:
         print(f"Error initializing Gemini Client: {e}")
-        gemini_client = None
+        return None
 
+@functools.lru_cache(maxsize=1)
+def get_tavily_client():
     TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
     if not TAVILY_API_KEY:
         print("WARNING: TAVILY_API_KEY environment variable not set. Research will be disabled.")
-        tavily_client = None
-    else:
-        tavily_client = TavilyClient(api_key=TAVILY_API_KEY)
-        print("✓ Tavily client initialized")
-    
-    OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-    if not OPENROUTER_API_KEY:
-        print("WARNING: OPENROUTER_API_KEY environment variable not set. OpenRouter LLM will be disabled.")
-        openrouter_client = None
-    else:
-        try:
-            openrouter_client = OpenAI(
-                api_key=OPENROUTER_API_KEY,
-                base_url=OPENROUTER_BASE_URL,
-            )
-            print("✓ OpenRouter client initialized")
-        except Exception as e:
-            print(f"Error initializing OpenRouter Client: {e}")
-            openrouter_client = None
-
+        return None
+    client = TavilyClient(api_key=TAVILY_API_KEY)
+    print("✓ Tavily client initialized")
+    return client
 
+@functools.lru_cache(maxsize=1)
+def get_elevenlabs_client():
+    """Returns the ElevenLabs client, built on first use."""
     ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
     if not ELEVENLABS_API_KEY:
         print("WARNING: ELEVENLABS_API_KEY not set. Video audio generation will be disabled.")
-    else:
-        try:
-            # NOTE: We use the mock client if you haven't installed the real one.
-            # Replace the mock with the real client if possible in your environment:
-            import elevenlabs.client
-            elevenlabs_client = elevenlabs.client.ElevenLabs(api_key=ELEVENLABS_API_KEY)
-            print("✓ ElevenLabs client initialized (using Mock or Real).")
-        except Exception as e:
-            print(f"Error initializing ElevenLabs Client: {e}")
-            elevenlabs_client = None
-            
-    # 2. Fireworks AI Key (Image/Video Assets)
-    fireworks_api_key = os.getenv("FIREWORKS_API_KEY") 
-    if not fireworks_api_key:
-        print("WARNING: FIREWORKS_API_KEY not set. Video image generation will be disabled.")
-
-     
-
- 
-
-def get_groq_client():
-    return groq_client
-
-def get_gemini_client():
-    return gemini_client
-
-def get_tavily_client():
-    return tavily_client
-
-def get_elevenlabs_client():
-    """Returns the initialized ElevenLabs client."""
-    return elevenlabs_client
+        return None
+    try:
+        # NOTE: We use the mock client if you haven't installed the real one.
+        # Replace the mock with the real client if possible in your environment:
+        import elevenlabs.client
+        client = elevenlabs.client.ElevenLabs(api_key=ELEVENLABS_API_KEY)
+        print("✓ ElevenLabs client initialized (using Mock or Real).")
+        return client
+    except Exception as e:
+        print(f"Error initializing ElevenLabs Client: {e}")
+        return None
 
 def get_fireworks_api_key():
     """Returns the Fireworks AI API key."""
-    return fireworks_api_key
+    return os.getenv("FIREWORKS_API_KEY")
 
 def get_base_video_assets_dir():
     """Returns the base path for all video assets (images, audio, final video)."""
     return BASE_VIDEO_ASSETS_DIR
 
+@functools.lru_cache(maxsize=1)
 def get_openrouter_client():
-    return openrouter_client
+    OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+    if not OPENROUTER_API_KEY:
+        print("WARNING: OPENROUTER_API_KEY environment variable not set. OpenRouter LLM will be disabled.")
+        return None
+    try:
+        client = OpenAI(
+            api_key=OPENROUTER_API_KEY,
+            base_url=OPENROUTER_BASE_URL,
+        )
+        print("✓ OpenRouter client initialized")
+        return client
+    except Exception as e:
+        print(f"Error initializing OpenRouter Client: {e}")
+        return None
 
 # 🌟 NEW: Dedicated Getter functions for all Gemini clients
+@functools.lru_cache(maxsize=1)
 def get_gemini_client_research():
-    return gemini_client_research
+    return _init_gemini_client("research")
 
+@functools.lru_cache(maxsize=1)
 def get_gemini_client_image_prompt():
-    return gemini_client_image_prompt
+    return _init_gemini_client("image_prompt")
 
+@functools.lru_cache(maxsize=1)
 def get_gemini_client_blog_prompt():
-    return gemini_client_blog_prompt
+    return _init_gemini_client("blog_prompt")
 
+@functools.lru_cache(maxsize=1)
 def get_gemini_client_video_1():
-    return gemini_client_video_1
+    return _init_gemini_client("video_1")
 
+@functools.lru_cache(maxsize=1)
 def get_gemini_client_video_2():
-    return gemini_client_video_2
+    return _init_gemini_client("video_2")
 
 def get_youtube_client_id():
     """Returns the configured YouTube Client ID."""
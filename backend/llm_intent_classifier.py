@@ -1,16 +1,21 @@
 # llm_intent_classifier.py
 
-import json
+import orjson
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel,Field
+from pydantic import BaseModel, ConfigDict, Field
 from google import genai
 from google.genai import types
 from openai import OpenAI
 # Import ResearchQueries model needed for ContentStrategy
 from Campaign.campaign_tavily_search import ResearchQueries
+from api_cache import cached
 
 # --- Pydantic Models (Copied from original for self-containment/clean imports) ---
 class ContentStrategy(BaseModel):
+    # frozen: strategies are read-only once classified; extra='ignore'
+    # keeps LLM output drift (unexpected keys) from failing validation
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
     intent: str
     keywords: List[str]
     content_summary: str
@@ -26,9 +31,9 @@ class ContentStrategy(BaseModel):
 # --- End Pydantic Models ---
 
 
-def get_strategy_system_prompt() -> str:
-    """Returns the system prompt for intent classification and strategy generation."""
-    return """
+# Built once at module load — the prompt never varies, so returning the
+# same interned constant avoids re-materializing a multi-KB string per call
+_STRATEGY_SYSTEM_PROMPT = """
 You are a world-class content strategist and planner. Your task is to analyze a user's topic 
 and return a single JSON object that MUST strictly conform to the specified schema. 
 Do not include any extra keys or text outside the JSON block. 
@@ -90,30 +95,45 @@ Example for 'campaign' intent:
 }
 """
 
-def classify_and_strategize(topic: str, gemini_client: OpenAI) -> ContentStrategy:
-    """Calls the first LLM to determine intent and initial strategy."""
-    strategy_system_prompt = get_strategy_system_prompt()
+
+def get_strategy_system_prompt() -> str:
+    """Returns the system prompt for intent classification and strategy generation."""
+    return _STRATEGY_SYSTEM_PROMPT
+
+
+# Cached with a 1h TTL keyed on the topic (the client handle is excluded
+# from the key): retries and dev re-runs with an identical topic return
+# the stored strategy instead of paying another LLM round-trip. Failures
+# raise out of this helper so the error fallback is never cached.
+@cached("openrouter", ttl=3600, skip_args=1)
+def _classify_and_strategize_uncached(gemini_client: OpenAI, topic: str) -> ContentStrategy:
     user_topic_prompt = f"Analyze the following topic and generate the content strategy JSON: {topic}"
 
     # Use a validated model name (e.g., gemini-2.0-flash)
-    try:
-        response = gemini_client.chat.completions.create(
-            model="google/gemini-2.0-flash-001",
-            messages=[
-                {"role": "system", "content": strategy_system_prompt},
-                {"role": "user", "content": user_topic_prompt}
-            ],
-            temperature=0.7,
-            response_format={"type": "json_object"}
-        )
-        
-        print("\n--- LLM Intent Classifier JSON Response ---")
-        print(response.choices[0].message.content)
-        print("-------------------------------------------\n")
-
-        llm_output_data = json.loads(response.choices[0].message.content)
-        return ContentStrategy(**llm_output_data)
+    response = gemini_client.chat.completions.create(
+        model="google/gemini-2.0-flash-001",
+        messages=[
+            {"role": "system", "content": _STRATEGY_SYSTEM_PROMPT},
+            {"role": "user", "content": user_topic_prompt}
+        ],
+        temperature=0.7,
+        response_format={"type": "json_object"}
+    )
+
+    print("\n--- LLM Intent Classifier JSON Response ---")
+    print(response.choices[0].message.content)
+    print("-------------------------------------------\n")
+
+    llm_output_data = orjson.loads(response.choices[0].message.content)
+    # model_validate hits pydantic-core's Rust validator directly instead
+    # of the dict-expansion __init__ path
+    return ContentStrategy.model_validate(llm_output_data)
 
+
+def classify_and_strategize(topic: str, gemini_client: OpenAI) -> ContentStrategy:
+    """Calls the first LLM to determine intent and initial strategy."""
+    try:
+        return _classify_and_strategize_uncached(gemini_client, topic)
     except Exception as e:
         print(f"Error during Intent Classification: {e}")
         # Return a fallback strategy if LLM fails
@@ -0,0 +1,31 @@
+# logging_setup.py
+# Non-blocking logging for the hot generation paths.
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+
+# Hot coroutines log through an unbounded queue; a single background thread
+# drains it to stdout, so no async task ever blocks on terminal I/O.
+_listener = None
+
+
+def setup_queue_logging():
+    """Routes the root logger through a QueueHandler + background listener."""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    root = logging.getLogger()
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -39,7 +39,7 @@ from  personal.personal_image_generator import (
     map_ratio_to_dimensions,
     generate_image_nano_banana
 )
-from Campaign.campaign_tavily_search import perform_tavily_search
+from Campaign.campaign_tavily_search import perform_tavily_search_async
 from Campaign.research_analysis import perform_research_analysis
 from Campaign.blog.blog_prompt_generator import generate_blog_prompt
 from Campaign.image.image_prompt_generator import generate_image_prompts
@@ -82,7 +82,12 @@ async def rate_limited_fireworks_call(func, api_key_num, *args, **kwargs):
     }
     semaphore = semaphores.get(api_key_num, RateLimiters.fireworks_semaphore_1)
     async with semaphore:
-        result = await asyncio.to_thread(func, *args, **kwargs)
+        # Async callables (e.g. generate_campaign_images) run on the loop;
+        # sync ones are pushed to a worker thread
+        if asyncio.iscoroutinefunction(func):
+            result = await func(*args, **kwargs)
+        else:
+            result = await asyncio.to_thread(func, *args, **kwargs)
         return result
 
 
@@ -210,7 +215,7 @@ async def analyze_topic(
                         raise HTTPException(status_code=500, detail="Gemini client (Research key) failed to initialize.")
                     
                     # SERIAL: Research Analysis (Foundation for all pipelines)
-                    tavily_results = perform_tavily_search(strategy_model.research_queries, tavily_client)
+                    tavily_results = await perform_tavily_search_async(strategy_model.research_queries, tavily_client)
                     final_response["research_results"] = tavily_results
                     strategic_brief_model = perform_research_analysis(topic, tavily_results, client_research)
                     final_response["strategic_brief"] = strategic_brief_model.model_dump()
@@ -230,25 +235,34 @@ async def analyze_topic(
                     # ═══════════════════════════════════════════════════════════
                     
                     async def blog_pipeline():
-                        """Blog content + hero image generation"""
-                        blog_image_local_path = None
-                        try:
-                            print(f"\n🖼 [BLOG] Starting hero image generation...")
-                            blog_image_url, blog_image_local_path = await asyncio.to_thread(
-                                generate_blog_image,
+                        """Blog content + hero image generation (run concurrently)"""
+                        print(f"\n🖼 [BLOG] Starting hero image + content generation...")
+                        # The hero image and the Groq text only depend on the prompt
+                        # JSON, so they overlap: wall time is max, not sum, of the two
+                        image_result, final_blog_text = await asyncio.gather(
+                            generate_blog_image(
                                 image_prompt=blog_prompt_model.visual_image_prompt,
-                                campaign_id=campaign_id 
-                            )
-                            print(f"✅ [BLOG] Hero image generated!")
-                        except Exception as e:
-                            print(f"❌ [BLOG] Hero image failed: {str(e)}")
-                            blog_image_url = f"Image generation failed: {str(e)}"
-                        
-                        final_blog_text = await asyncio.to_thread(
-                            generate_final_blog_content,
-                            blog_prompt_data=blog_prompt_model,
-                            groq_client=groq_client
+                                campaign_id=campaign_id
+                            ),
+                            asyncio.to_thread(
+                                generate_final_blog_content,
+                                blog_prompt_data=blog_prompt_model,
+                                groq_client=groq_client
+                            ),
+                            return_exceptions=True
                         )
+
+                        if isinstance(image_result, Exception):
+                            print(f"❌ [BLOG] Hero image failed: {str(image_result)}")
+                            blog_image_url = f"Image generation failed: {str(image_result)}"
+                            blog_image_local_path = None
+                        else:
+                            blog_image_url, blog_image_local_path = image_result
+                            print(f"✅ [BLOG] Hero image generated!")
+
+                        if isinstance(final_blog_text, Exception):
+                            raise final_blog_text
+
                         print("✅ [BLOG] Content generation complete!")
                         return {
                             "blog_content": final_blog_text,
@@ -270,10 +284,9 @@ async def analyze_topic(
                             required_image_count=required_image_count
                         )
                         
-                        generated_ad_assets = await asyncio.to_thread(
-                            generate_all_ad_images,
+                        generated_ad_assets = await generate_all_ad_images(
                             image_prompt_list=image_prompt_list_model,
-                           campaign_id=campaign_id 
+                            campaign_id=campaign_id
                         )
                         print(f"✅ [AD IMAGES] {len(generated_ad_assets)} assets generated!")
                         return {
@@ -328,8 +341,8 @@ async def analyze_topic(
                             print(f"\n🎥 [VIDEO - {label}] Starting {duration_s}s pipeline with API Key #{api_key_num}...")
                             
                             # Step A: Bible & Script
-                            video_bible_model = await asyncio.to_thread(
-                                generate_video_bible, strategic_brief_model, strategy_model.keywords, client_video_1
+                            video_bible_model = await generate_video_bible(
+                                strategic_brief_model, strategy_model.keywords, client_video_1
                             )
                             
                             script_model = await asyncio.to_thread(
@@ -348,8 +361,8 @@ async def analyze_topic(
                             await asyncio.to_thread(generate_srt, audio_sync_output.timestamps, srt_path)
                             ffmpeg_srt_path = get_ffmpeg_compatible_path(str(srt_path))
 
-                            storyboard_model = await asyncio.to_thread(
-                                generate_storyboard, script_model.full_narration, audio_sync_output, video_bible_model, strategic_brief_model, client_video_1
+                            storyboard_model = await generate_storyboard(
+                                script_model.full_narration, audio_sync_output, video_bible_model, strategic_brief_model, client_video_1
                             )
                             
                             optimized_prompts = await asyncio.to_thread(
@@ -495,7 +508,7 @@ async def analyze_topic(
                     if not isinstance(blog_result, Exception) and blog_image_local_path:
                         try:
                             print("\n📝 Creating WordPress draft...")
-                            draft_data = create_draft_post_to_wordpress(
+                            draft_data = await create_draft_post_to_wordpress(
                                 request=request,
                                 title=blog_prompt_model.title,
                                 content=blog_result["blog_content"],
@@ -532,7 +545,7 @@ async def analyze_topic(
                 if not client_research:
                     raise HTTPException(status_code=500, detail="Gemini client (Research) failed.")
                 
-                tavily_results = perform_tavily_search(strategy_model.research_queries, tavily_client)
+                tavily_results = await perform_tavily_search_async(strategy_model.research_queries, tavily_client)
                 final_response["research_results"] = tavily_results
                 
                 strategic_brief_model = perform_research_analysis(topic, tavily_results, client_research)
@@ -555,27 +568,34 @@ async def analyze_topic(
                 # ═══════════════════════════════════════════════════════════
 
                 async def premium_blog_pipeline():
-                    """Premium: Blog text + Nano Banana Hero Image"""
-                    blog_image_local_path = None
-                    try:
-                        print(f"🖼 [PREMIUM BLOG] Generating Nano Banana Hero Image...")
-                        # Call your premium blog image function
-                        blog_image_url, blog_image_local_path = await asyncio.to_thread(
-                            generate_blog_image_premium, 
+                    """Premium: Blog text + Nano Banana Hero Image (run concurrently)"""
+                    print(f"🖼 [PREMIUM BLOG] Generating Hero Image + Content in parallel...")
+                    # Image and text are independent once the prompt JSON exists
+                    image_result, final_blog_text = await asyncio.gather(
+                        asyncio.to_thread(
+                            generate_blog_image_premium,
                             image_prompt=blog_prompt_model.visual_image_prompt,
                             campaign_id=campaign_id,
                             gemini_client=client_image_prompt
-                        )
-                    except Exception as e:
-                        print(f"❌ [PREMIUM BLOG IMAGE] Failed: {e}")
+                        ),
+                        asyncio.to_thread(
+                            generate_final_blog_content,
+                            blog_prompt_data=blog_prompt_model,
+                            groq_client=groq_client
+                        ),
+                        return_exceptions=True
+                    )
+
+                    if isinstance(image_result, Exception):
+                        print(f"❌ [PREMIUM BLOG IMAGE] Failed: {image_result}")
                         blog_image_url = "N/A"
+                        blog_image_local_path = None
+                    else:
+                        blog_image_url, blog_image_local_path = image_result
+
+                    if isinstance(final_blog_text, Exception):
+                        raise final_blog_text
 
-                    # Generate High-Tier Blog Content
-                    final_blog_text = await asyncio.to_thread(
-                        generate_final_blog_content,
-                        blog_prompt_data=blog_prompt_model,
-                        groq_client=groq_client
-                    )
                     return {
                         "blog_content": final_blog_text,
                         "blog_image_url": blog_image_url,
@@ -594,12 +614,11 @@ async def analyze_topic(
                         required_image_count=required_image_count
                     )
                     
-                    # Call your premium ad asset orchestrator
-                    generated_ad_assets = await asyncio.to_thread(
-                        generate_all_ad_images_premium,
+                    # Call your premium ad asset orchestrator (async, runs prompts in parallel)
+                    generated_ad_assets = await generate_all_ad_images_premium(
                         image_prompt_list=image_prompt_list_model,
                         gemini_client=client_image_prompt,
-                        campaign_id=campaign_id 
+                        campaign_id=campaign_id
                     )
                     
                     return {
@@ -635,7 +654,7 @@ async def analyze_topic(
                 # 5. WordPress & X Draft Preparation (Shared Logic)
                 if not isinstance(blog_res, Exception) and blog_image_local_path:
                     try:
-                        draft_data = create_draft_post_to_wordpress(
+                        draft_data = await create_draft_post_to_wordpress(
                             request=request,
                             title=blog_prompt_model.title,
                             content=blog_res["blog_content"],
@@ -737,7 +756,7 @@ async def schedule_post_action(
             
             if action == 'discard' or action == 'trash':
                 print(f"🗑 WordPress: Discarding post {post_id}")
-                wp_result = update_and_schedule_post(request, post_id, 'trash')
+                wp_result = await update_and_schedule_post(request, post_id, 'trash')
                 return JSONResponse({
                     "status": "Success",
                     "platform": "wordpress",
@@ -747,7 +766,7 @@ async def schedule_post_action(
             
             elif action == 'publish':
                 print(f"🔥 WordPress: Publishing post {post_id} immediately")
-                wp_result = update_and_schedule_post(request, post_id, 'publish')
+                wp_result = await update_and_schedule_post(request, post_id, 'publish')
                 return JSONResponse({
                     "status": "Success",
                     "platform": "wordpress",
@@ -760,7 +779,7 @@ async def schedule_post_action(
                     raise HTTPException(status_code=400, detail="publish_time is required for scheduling")
                 
                 print(f"🕰 WordPress: Scheduling post {post_id} for {publish_time}")
-                wp_result = update_and_schedule_post(request, post_id, 'schedule', publish_time)
+                wp_result = await update_and_schedule_post(request, post_id, 'schedule', publish_time)
                 return JSONResponse({
                     "status": "Success",
                     "platform": "wordpress",
@@ -801,8 +820,7 @@ async def schedule_post_action(
             elif action == 'publish':
                 print(f"📺 YouTube: Publishing video immediately - {video_title}")
                 try:
-                    youtube_result = await asyncio.to_thread(
-                        publish_video_to_youtube,
+                    youtube_result = await publish_video_to_youtube(
                         request=request,
                         video_file_path=video_path,
                         title=video_title,
@@ -857,8 +875,7 @@ async def schedule_post_action(
                 
                 print(f"🕰 YouTube: Scheduling video for {publish_time} - {video_title}")
                 try:
-                    youtube_result = await asyncio.to_thread(
-                        publish_video_to_youtube,
+                    youtube_result = await publish_video_to_youtube(
                         request=request,
                         video_file_path=video_path,
                         title=video_title,
@@ -15,7 +15,7 @@ router = APIRouter()
 @router.get("/status")
 async def get_wordpress_status(request: Request):
     """Check if the user is currently connected (checks file + session)."""
-    return {"connected": is_wordpress_connected(request)}
+    return {"connected": await is_wordpress_connected(request)}
 
 @router.get("/connect_wordpress")
 async def connect_wordpress(request: Request):
@@ -62,13 +62,13 @@ async def wordpress_callback(
         return RedirectResponse(url=f"/?wp_error=No%20code", status_code=303)
         
     try:
-        auth_data = handle_oauth_callback_exchange(
+        auth_data = await handle_oauth_callback_exchange(
             code=code,
             state=state,
             expected_state=session_state
         )
          
-        save_persistent_credentials(
+        await save_persistent_credentials(
             access_token=request.session.get('wp_access_token'),
             blog_id=request.session.get('wp_blog_id'),
             user_sites=request.session.get('wp_user_sites')
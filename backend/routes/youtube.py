@@ -9,6 +9,7 @@ from Campaign.youtube_publish import (
     disconnect_youtube,
     verify_youtube_channel,
     publish_video_to_youtube,
+    get_upload_progress,
 )
 
 router = APIRouter()
@@ -71,6 +72,16 @@ async def youtube_status(request: Request):
     return JSONResponse(response_data)
 
 
+@router.get("/youtube/upload/{upload_id}/progress")
+async def youtube_upload_progress(upload_id: str):
+    """Poll percent-complete for an in-flight upload (pass the same
+    upload_id to /youtube/upload_and_schedule)."""
+    progress = get_upload_progress(upload_id)
+    if progress is None:
+        return JSONResponse({"upload_id": upload_id, "in_progress": False})
+    return JSONResponse({"upload_id": upload_id, "in_progress": True, "progress": progress})
+
+
 # --- UPLOAD & SCHEDULING ENDPOINT ---
 
 @router.post("/youtube/upload_and_schedule")
@@ -80,22 +91,24 @@ async def upload_and_schedule_video(
     title: str = Form(...),
     description: Optional[str] = Form(""),
     privacy: Optional[str] = Form("unlisted"),
-    publish_time: Optional[str] = Form(None)
+    publish_time: Optional[str] = Form(None),
+    upload_id: Optional[str] = Form(None)
 ):
     """Upload video to YouTube with optional scheduling."""
     try:
         # Convert URL path to local file path
         local_video_path = video_file_url.lstrip('/')
-        
-        upload_result = publish_video_to_youtube(
+
+        upload_result = await publish_video_to_youtube(
             request=request,
             video_file_path=local_video_path,
             title=title,
             description=description,
             privacy=privacy,
-            publish_at=publish_time
+            publish_at=publish_time,
+            upload_id=upload_id
         )
-        
+
         return JSONResponse(upload_result)
     
     except HTTPException as e: